@@ -3,29 +3,57 @@
 from __future__ import annotations
 
 import email.utils
-import inspect
-import random
+import json
+import re
+import threading
 import time
-from types import FrameType
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from http import HTTPStatus
+from itertools import islice
+from queue import Full, Queue
 from typing import TYPE_CHECKING, Any, ClassVar, cast
 from urllib.parse import parse_qs, urlparse
 
+import requests
 from dateutil.parser import parse
-from nested_lookup import nested_lookup
+from singer_sdk import metrics
 from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.streams import GraphQLStream, RESTStream
 
-from tap_github.authenticator import GitHubTokenAuthenticator
+from tap_github.authenticator import (
+    GRAPHQL_RESOURCE,
+    SEARCH_RESOURCE,
+    GitHubTokenAuthenticator,
+    get_rate_limit_resource,
+)
+from tap_github.decoding import decode_json, set_decoded_json
+from tap_github.graphql_cost import count_connection_requests, estimate_query_cost
+from tap_github.graphql_pagination import compile_pagination_paths, find_values
+from tap_github.sessions import get_session
+from tap_github.sizing import (
+    AdaptiveSize,
+    QueryTimeoutError,
+    QueryTooLargeError,
+    is_sizing_error,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Generator, Iterable
 
-    import requests
     from backoff.types import Details
+    from singer_sdk.helpers.types import Context, Record
+
+    from tap_github.etag_cache import ETagCache
+    from tap_github.partition_timings import PartitionTimingsCache
 
 EMPTY_REPO_ERROR_STATUS = 409
 
+# The types of the GraphQL errors of queries asking for too many nodes at once.
+QUERY_TOO_LARGE_ERROR_TYPES = ("MAX_NODE_LIMIT_EXCEEDED", "RESOURCE_LIMITS_EXCEEDED")
+
 
 class GitHubRestStream(RESTStream):
     """GitHub Rest stream class."""
@@ -43,6 +71,31 @@ class GitHubRestStream(RESTStream):
 
     _authenticator: GitHubTokenAuthenticator | None = None
 
+    # Guards the state of the tap, which all streams write to, when partitions are
+    # synced concurrently.
+    _state_lock = threading.RLock()
+
+    # Set to True on child streams with few records per parent record, so that
+    # when `child_stream_workers` is set, their records are fetched concurrently
+    # with their siblings' and with those of upcoming parent records. Prefetched
+    # records are held in memory until the child stream is synced.
+    prefetch_records = False
+
+    # Set to True on streams whose pages can be requested in any order, so that when
+    # `page_workers` is set, the pages following the first are requested
+    # concurrently once the first reveals the last page.
+    fetch_pages_ahead = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__init__(*args, **kwargs)
+        self._prefetched_records: dict[str, Future[list[dict]]] = {}
+        self._prefetched_records_lock = threading.Lock()
+        # ETags of the responses of each context, until its records are synced, and
+        # then until a STATE message accounting for them is written.
+        self._pending_etags: dict[str, list[tuple[str, str, str | None]]] = {}
+        self._synced_etags: list[tuple[str, str, str | None]] = []
+        self._etags_lock = threading.Lock()
+
     @property
     def authenticator(self) -> GitHubTokenAuthenticator:
         if self._authenticator is None:
@@ -53,6 +106,25 @@ class GitHubRestStream(RESTStream):
     def url_base(self) -> str:
         return self.config.get("api_url_base", self.DEFAULT_API_BASE_URL)
 
+    @property
+    def requests_session(self) -> requests.Session:
+        """The session shared by every stream of the tap for the API host."""
+        return get_session(self.url_base)
+
+    def build_prepared_request(
+        self,
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> requests.PreparedRequest:
+        """Build an authenticated request.
+
+        Unlike the SDK, this does not set the stream's authenticator on the session,
+        which is shared with other streams.
+        """
+        request = requests.Request(*args, **kwargs)
+        request.auth = self.authenticator
+        return self.requests_session.prepare_request(request)
+
     primary_keys: ClassVar[list[str]] = ["id"]
     replication_key: str | None = None
     tolerated_http_errors: ClassVar[list[int]] = []
@@ -83,7 +155,7 @@ class GitHubRestStream(RESTStream):
         if "next" not in response.links:
             return None
 
-        resp_json = response.json()
+        resp_json = decode_json(response)
         results = resp_json if isinstance(resp_json, list) else resp_json.get("items")
 
         # Exit early if the response has no items. ? Maybe duplicative the "next" link check.  # noqa: E501
@@ -170,11 +242,331 @@ class GitHubRestStream(RESTStream):
         since_key = "since" if not self.use_fake_since_parameter else "fake_since"
         if self.replication_key and since:
             params[since_key] = since.isoformat(sep="T")
-            # Leverage conditional requests to save API quotas
-            # https://github.community/t/how-does-if-modified-since-work/139627
-            self._http_headers["If-modified-since"] = email.utils.format_datetime(since)
         return params
 
+    def prepare_request(
+        self,
+        context: Context | None,
+        next_page_token: Any | None,  # noqa: ANN401
+    ) -> requests.PreparedRequest:
+        """Prepare a request, made conditional to save API quotas.
+
+        A response which was not modified is a `304 Not Modified`, which does not
+        count against the rate limit. Requests are only made conditional when
+        `conditional_requests` is set, see `use_conditional_requests`.
+        """
+        prepared_request = super().prepare_request(context, next_page_token)
+        if (
+            not self.use_conditional_requests
+            or prepared_request.method != "GET"
+            or not self.is_api_url(prepared_request.url)
+        ):
+            return prepared_request
+
+        # The first page is not modified if no record was updated since the bookmark.
+        # https://github.community/t/how-does-if-modified-since-work/139627
+        since = self.get_starting_timestamp(context)
+        if self.replication_key and since and not next_page_token:
+            prepared_request.headers["If-Modified-Since"] = email.utils.format_datetime(
+                since.astimezone(timezone.utc), usegmt=True
+            )
+
+        etag_cache = self.etag_cache
+        if etag_cache is not None and prepared_request.url:
+            etag = etag_cache.get_etag(
+                prepared_request.url, prepared_request.headers.get("Accept")
+            )
+            if etag:
+                prepared_request.headers["If-None-Match"] = etag
+        return prepared_request
+
+    @property
+    def use_conditional_requests(self) -> bool:
+        """Whether requests of the stream are made conditional.
+
+        A response which was not modified yields no record, so only incremental
+        streams without child streams make conditional requests: their records were
+        synced by a previous run, and no child stream relies on them.
+        """
+        return bool(
+            self.config.get("conditional_requests")
+            and self.replication_key
+            and not self.child_streams
+        )
+
+    def is_api_url(self, url: str | None) -> bool:
+        api_url_base = self.config.get("api_url_base", self.DEFAULT_API_BASE_URL)
+        return bool(url and url.startswith(api_url_base))
+
+    @property
+    def etag_cache(self) -> ETagCache | None:
+        """The tap's cache of ETags, if `etag_cache_path` is set."""
+        tap: Any = self._tap
+        return tap.get_etag_cache() if hasattr(tap, "get_etag_cache") else None
+
+    def update_etag_cache(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+        context: Context | None = None,
+    ) -> None:
+        """Keep the ETag of a response holding the last results of an endpoint.
+
+        A 304 to a request ends the pagination, so ETags of pages followed by others
+        are not kept, nor those of full pages which could be followed by new ones.
+        The ETag is only added to the cache once the records of the context are
+        synced, and a STATE message accounting for them is written.
+        """
+        etag_cache = self.etag_cache
+        etag = response.headers.get("ETag")
+        if (
+            etag_cache is None
+            or not self.use_conditional_requests
+            or not etag
+            or request.method != "GET"
+            or response.status_code != HTTPStatus.OK
+            or not self.is_api_url(request.url)
+            or not request.url
+        ):
+            return
+
+        accept = request.headers.get("Accept")
+        try:
+            resp_json = decode_json(response)
+        except ValueError:
+            # e.g. a diff, which is a single record
+            resp_json = None
+        results = resp_json.get("items") if isinstance(resp_json, dict) else resp_json
+        if "next" in response.links or (
+            isinstance(results, list) and len(results) >= self.MAX_PER_PAGE
+        ):
+            etag_cache.discard(request.url, accept)
+            return
+        with self._etags_lock:
+            self._pending_etags.setdefault(self._get_etags_key(context), []).append(
+                (request.url, etag, accept)
+            )
+
+    def release_etags(self, context: Context | None) -> None:
+        """Mark the ETags of a context as synced, once all its records are."""
+        with self._etags_lock:
+            self._synced_etags.extend(
+                self._pending_etags.pop(self._get_etags_key(context), [])
+            )
+
+    def save_etags(self) -> None:
+        """Add the ETags of synced records to the cache, once a STATE message is."""
+        etag_cache = self.etag_cache
+        with self._etags_lock:
+            synced_etags, self._synced_etags = self._synced_etags, []
+        if etag_cache is not None:
+            for url, etag, accept in synced_etags:
+                etag_cache.set_etag(url, etag, accept)
+
+    @staticmethod
+    def _get_etags_key(context: Context | None) -> str:
+        return json.dumps(context or {}, sort_keys=True, default=str)
+
+    def request_records(self, context: Context | None) -> Iterable[dict]:
+        """Request records from REST endpoint(s), returning response records.
+
+        Unlike the SDK, a response which was not modified is not parsed, and ends the
+        pagination. Its records were synced by a previous run.
+
+        When `read_ahead_pages` is set, pages are requested by a background thread as
+        soon as their token is known, while the records of the previous pages are
+        processed.
+        """
+        pages = 0
+        read_ahead_pages = self.config.get("read_ahead_pages") or 0
+        responses = self.request_pages(context)
+        if read_ahead_pages > 0:
+            responses = self._read_ahead(responses, read_ahead_pages)
+
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+
+            try:
+                for prepared_request, resp in responses:
+                    request_counter.increment()
+                    self.update_sync_costs(prepared_request, resp, context)
+                    if resp.status_code == HTTPStatus.NOT_MODIFIED:
+                        self.logger.info(
+                            "Pagination stopped after %d pages because the last "
+                            "response was not modified",
+                            pages,
+                        )
+                        break
+                    records = iter(self.parse_response(resp))
+                    try:
+                        first_record = next(records)
+                    except StopIteration:
+                        self.logger.info(
+                            "Pagination stopped after %d pages because no records "
+                            "were found in the last response",
+                            pages,
+                        )
+                        break
+                    yield first_record
+                    yield from records
+                    pages += 1
+            finally:
+                responses.close()
+
+    def request_pages(
+        self, context: Context | None
+    ) -> Generator[tuple[requests.PreparedRequest, requests.Response], None, None]:
+        """Request the pages of an endpoint, returning each request and response.
+
+        When the first page links to the last one, and the stream opts in with
+        `fetch_pages_ahead`, the following pages are requested concurrently, up to
+        `page_workers` at a time. Their responses are still returned in page order.
+        """
+        paginator = self.get_new_paginator()
+        decorated_request_page = self.request_decorator(self.request_page)
+        first_page = True
+
+        while not paginator.finished:
+            prepared_request, resp = decorated_request_page(
+                context, paginator.current_value
+            )
+            yield prepared_request, resp
+
+            last_page = self.get_last_page(resp, context) if first_page else 0
+            first_page = False
+            if last_page > 1:
+                resp = yield from self._request_pages_ahead(
+                    context, decorated_request_page, last_page
+                )
+            # Also follows the pages added after the last page requested ahead, if any.
+            paginator.advance(resp)
+
+    def request_page(
+        self,
+        context: Context | None,
+        next_page_token: Any | None,  # noqa: ANN401
+    ) -> tuple[requests.PreparedRequest, requests.Response]:
+        """Prepare and send the request of a page.
+
+        When decorated with `request_decorator`, every retry prepares the request
+        again, so that it is sent with what changed since, such as a smaller page
+        size after a GraphQL query timed out.
+        """
+        prepared_request = self.prepare_request(context, next_page_token)
+        return prepared_request, self._request(
+            prepared_request, cast("dict | None", context)
+        )
+
+    def _request_pages_ahead(
+        self,
+        context: Context | None,
+        decorated_request_page: Callable[
+            ..., tuple[requests.PreparedRequest, requests.Response]
+        ],
+        last_page: int,
+    ) -> Generator[
+        tuple[requests.PreparedRequest, requests.Response], None, requests.Response
+    ]:
+        page_workers = self.config["page_workers"]
+        next_pages = iter(range(2, last_page + 1))
+        pages_ahead: deque[
+            Future[tuple[requests.PreparedRequest, requests.Response]]
+        ] = deque()
+
+        with ThreadPoolExecutor(
+            max_workers=page_workers, thread_name_prefix=f"{self.name}-pages"
+        ) as executor:
+
+            def request_pages(count: int) -> None:
+                pages_ahead.extend(
+                    executor.submit(decorated_request_page, context, page)
+                    for page in islice(next_pages, count)
+                )
+
+            try:
+                request_pages(page_workers)
+                while True:
+                    prepared_request, resp = pages_ahead.popleft().result()
+                    request_pages(1)
+                    yield prepared_request, resp
+                    if not pages_ahead:
+                        return resp
+            finally:
+                for future in pages_ahead:
+                    future.cancel()
+
+    def _read_ahead(
+        self,
+        responses: Generator[
+            tuple[requests.PreparedRequest, requests.Response], None, None
+        ],
+        read_ahead_pages: int,
+    ) -> Generator[tuple[requests.PreparedRequest, requests.Response], None, None]:
+        """Iterate over responses in a background thread, ahead of their processing.
+
+        Up to `read_ahead_pages` responses wait in a queue for their records to be
+        processed, after which the background thread waits too.
+        """
+        queue: Queue[tuple[str, Any]] = Queue(maxsize=read_ahead_pages)
+        stopped = threading.Event()
+
+        def put(kind: str, value: Any) -> bool:  # noqa: ANN401
+            while not stopped.is_set():
+                try:
+                    queue.put((kind, value), timeout=0.1)
+                except Full:
+                    continue
+                return True
+            return False
+
+        def fetch() -> None:
+            try:
+                for response in responses:
+                    if not put("response", response):
+                        return
+                put("end", None)
+            except Exception as e:
+                put("error", e)
+            finally:
+                responses.close()
+
+        fetcher = threading.Thread(
+            target=fetch, name=f"{self.name}-read-ahead", daemon=True
+        )
+        fetcher.start()
+        try:
+            while True:
+                kind, value = queue.get()
+                if kind == "error":
+                    raise value
+                if kind == "end":
+                    return
+                yield value
+        finally:
+            stopped.set()
+            fetcher.join()
+
+    def get_last_page(
+        self, response: requests.Response, context: Context | None
+    ) -> int:
+        """Return the last page of a paginated endpoint, to request pages ahead.
+
+        Returns 0 when pages should be requested one after the other: when the stream
+        does not opt in, when `page_workers` is not above 1, when the number of
+        results is capped, or when the stream exits early on its own.
+        """
+        if (
+            not self.fetch_pages_ahead
+            or (self.config.get("page_workers") or 1) < 2
+            or self.MAX_RESULTS_LIMIT
+            or (self.use_fake_since_parameter and self.get_starting_timestamp(context))
+            or "last" not in response.links
+        ):
+            return 0
+        last_url = urlparse(response.links["last"]["url"])
+        last_page = parse_qs(last_url.query).get("page", [""])[0]
+        return int(last_page) if last_page.isdigit() else 0
+
     def validate_response(self, response: requests.Response) -> None:
         """Validate HTTP response.
 
@@ -215,17 +607,39 @@ class GitHubRestStream(RESTStream):
                 and "rate limit exceeded" in str(response.content).lower()
             ):
                 # Update token
-                self.authenticator.get_next_auth_token()
+                token = self.authenticator.get_request_token(response.request)
+                self.authenticator.update_rate_limit(response.headers, token=token)
+                token_manager = self.authenticator.token_pool.get_token_manager(token)
+                next_reset = self.authenticator.get_next_auth_token(
+                    get_rate_limit_resource(response.url),
+                    owner=token_manager.installation_owner if token_manager else None,
+                )
+                if next_reset is not None and not self.config.get("rate_limit_pacing"):
+                    raise FatalAPIError(
+                        f"{msg}. All GitHub tokens have hit their rate limit, "
+                        f"the next one resets at {next_reset}."
+                    )
                 # Raise an error to force a retry with the new token.
                 raise RetriableAPIError(msg, response)
 
             # Retry on secondary rate limit
             if (
-                response.status_code == 403
+                response.status_code in (403, 429)
                 and "secondary rate limit" in str(response.content).lower()
             ):
-                # Wait about a minute and retry
-                time.sleep(60 + 30 * random.random())
+                # Cool the offending token down, the retry waits for it or
+                # switches to another token.
+                token_pool = self.authenticator.token_pool
+                token_manager = token_pool.get_token_manager(
+                    self.authenticator.get_request_token(response.request)
+                )
+                token_pool.governor.record_secondary_rate_limit(
+                    token_manager, response.headers
+                )
+                self.authenticator.get_next_auth_token(
+                    get_rate_limit_resource(response.url),
+                    owner=token_manager.installation_owner if token_manager else None,
+                )
                 raise RetriableAPIError(msg, response)
 
             # The GitHub API randomly returns 401 Unauthorized errors, so we try again.
@@ -256,10 +670,7 @@ class GitHubRestStream(RESTStream):
         ):
             return
 
-        # Update token rate limit info and loop through tokens if needed.
-        self.authenticator.update_rate_limit(response.headers)
-
-        resp_json = response.json()
+        resp_json = decode_json(response)
 
         if isinstance(resp_json, list):
             results = resp_json
@@ -277,24 +688,47 @@ class GitHubRestStream(RESTStream):
         return row
 
     def backoff_handler(self, details: Details) -> None:
-        """Handle retriable error by swapping auth token."""
+        """Log retries, the token is swapped when the request is sent again."""
         self.logger.info("Retrying request with different token")
-        # use python introspection to obtain the error object
-        # FIXME: replace this once https://github.com/litl/backoff/issues/158
-        # is fixed
-        exc = cast(
-            FrameType,
-            cast(FrameType, cast(FrameType, inspect.currentframe()).f_back).f_back,
-        ).f_locals["e"]
-        if (
-            exc.response is not None
-            and exc.response.status_code == 403
-            and "rate limit exceeded" in str(exc.response.content)
-        ):
-            # we hit a rate limit, rotate token
-            prepared_request = details["args"][0]
-            self.authenticator.get_next_auth_token()
-            prepared_request.headers.update(self.authenticator.auth_headers or {})
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        """Send a request within the limits of the tap's secondary rate limit governor.
+
+        The request is authenticated right before being sent, so that every attempt,
+        including retries, uses the best token available at that time. Requests for
+        the repositories of an organization are routed to the GitHub App
+        installation of that organization, if there is one. Pacing and cooldowns
+        are waited for before taking a slot, so that a waiting request does not hold
+        back those for other resources or owners.
+        """
+        governor = self.authenticator.token_pool.governor
+        resource = get_rate_limit_resource(prepared_request.url or "")
+        owner = context.get("org") if context else None
+        self.pace_request(prepared_request)
+        governor.wait_for_cooldown(resource, owner)
+        with governor.request_slot():
+            self.authenticator.authenticate_request(prepared_request, owner=owner)
+            response = super()._request(prepared_request, context)
+        governor.record_success()
+        self.update_etag_cache(prepared_request, response, context)
+        return response
+
+    def pace_request(self, request: requests.PreparedRequest) -> float:
+        """Hold the request rate to what the tokens' quotas can sustain until reset.
+
+        Does nothing unless `rate_limit_pacing` is enabled.
+
+        Returns:
+            The number of seconds waited.
+        """
+        if not self.config.get("rate_limit_pacing"):
+            return 0.0
+        resource = get_rate_limit_resource(request.url or "")
+        return self.authenticator.token_pool.get_pacer(resource).wait()
 
     def calculate_sync_cost(
         self,
@@ -302,13 +736,360 @@ class GitHubRestStream(RESTStream):
         response: requests.Response,
         context: dict | None,
     ) -> dict[str, int]:
-        """Return the cost of the last REST API call."""
-        return {"rest": 1, "graphql": 0, "search": 0}
+        """Return the cost of the last REST API call.
+
+        The call is also charged to the rate limit of the token which made it, on
+        the resource (core or search) it counted against.
+        """
+        self.update_rate_limit(request, response)
+        resource = response.headers.get(
+            "X-RateLimit-Resource", get_rate_limit_resource(response.url)
+        )
+        is_search = resource in (SEARCH_RESOURCE, "code_search")
+        return {"rest": int(not is_search), "graphql": 0, "search": int(is_search)}
+
+    def update_rate_limit(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> None:
+        """Update token rate limit info, tokens are rotated when needed."""
+        self.authenticator.update_rate_limit(
+            response.headers, token=self.authenticator.get_request_token(request)
+        )
+
+    def update_sync_costs(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+        context: Context | None,
+    ) -> dict[str, int]:
+        with self._state_lock:
+            return super().update_sync_costs(request, response, context)
+
+    # Partitions of a stream can be synced concurrently, together with their child
+    # streams. The state of the tap is shared by all of them, so every method of the
+    # SDK reading or writing it holds the state lock. Messages are written one at a
+    # time by the tap, and a STATE message is only written after the RECORD messages
+    # it accounts for. A child stream is synced by several threads at once, so its
+    # SCHEMA messages are written under the state lock too.
+
+    @property
+    def stream_state(self) -> dict:
+        with self._state_lock:
+            return super().stream_state
+
+    def get_context_state(self, context: Context | None) -> dict:
+        with self._state_lock:
+            return super().get_context_state(context)
+
+    def _write_starting_replication_value(self, context: Context | None) -> None:
+        with self._state_lock:
+            super()._write_starting_replication_value(context)
+
+    def _increment_stream_state(
+        self,
+        latest_record: Record,
+        *,
+        context: Context | None = None,
+    ) -> None:
+        with self._state_lock:
+            super()._increment_stream_state(latest_record, context=context)
+
+    def _finalize_state(self, state: dict | None = None) -> None:
+        with self._state_lock:
+            super()._finalize_state(state)
+
+    def _write_state_message(self) -> None:
+        with self._state_lock:
+            super()._write_state_message()
+            self.save_etags()
+
+    def _write_schema_message(self) -> None:
+        with self._state_lock:
+            super()._write_schema_message()
+
+    def _sync_records(
+        self,
+        context: Context | None = None,
+        *,
+        write_messages: bool = True,
+    ) -> Generator[dict, Any, Any]:
+        """Sync records, syncing the partitions of the stream concurrently.
+
+        Up to `partition_workers` partitions, each with its child streams, are synced
+        at once. Their records are written as they come, and are not yielded.
+        """
+        partition_workers = self.config.get("partition_workers") or 1
+        partitions = (
+            self.partitions if context is None and partition_workers > 1 else None
+        )
+        if not partitions:
+            yield from super()._sync_records(context, write_messages=write_messages)
+            return
+
+        self.logger.info(
+            f"Syncing {len(partitions)} partitions of '{self.name}' "
+            f"with {partition_workers} workers"
+        )
+        # Start with the costliest partitions, so that workers finish close together.
+        partitions = sorted(partitions, key=self.get_partition_cost, reverse=True)
+        self._sync_partitions(partitions, partition_workers, write_messages)
+
+        # The whole stream was synced, finalize it like the SDK does.
+        self._finalize_state(self.stream_state)
+        if write_messages:
+            self._write_state_message()
+
+    @property
+    def partition_timings(self) -> PartitionTimingsCache | None:
+        """The tap's cache of partition timings, if `partition_timings_path` is set."""
+        tap: Any = self._tap
+        return (
+            tap.get_partition_timings()
+            if hasattr(tap, "get_partition_timings")
+            else None
+        )
+
+    def get_partition_cost(self, partition: dict) -> tuple:
+        """Return an estimate of the cost of syncing a partition, to sort partitions.
+
+        Partitions are compared on how long they took to sync on the previous run,
+        which is kept in the tap's partition timings cache rather than in the state.
+        Partitions which were not timed yet come first.
+        """
+        partition_timings = self.partition_timings
+        sync_seconds = (
+            partition_timings.get_seconds(self.name, partition)
+            if partition_timings is not None
+            else None
+        )
+        return (sync_seconds is None, sync_seconds or 0)
+
+    def _sync_partitions(
+        self,
+        partitions: list[dict],
+        partition_workers: int,
+        write_messages: bool,
+    ) -> None:
+        """Sync partitions in a pool of threads, stopping at the first failure."""
+
+        partition_timings = self.partition_timings
+
+        def sync_partition(partition: dict) -> None:
+            start_time = time.monotonic()
+            for _ in super(GitHubRestStream, self)._sync_records(
+                partition, write_messages=write_messages
+            ):
+                pass
+            if partition_timings is not None:
+                partition_timings.set_seconds(
+                    self.name, partition, round(time.monotonic() - start_time, 3)
+                )
+
+        with ThreadPoolExecutor(
+            max_workers=min(partition_workers, len(partitions)),
+            thread_name_prefix=self.name,
+        ) as executor:
+            futures = [
+                executor.submit(sync_partition, partition) for partition in partitions
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def get_records(self, context: dict | None) -> Iterable[dict[str, Any]]:
+        """Return the records of a context, fetching those of child streams ahead.
+
+        Records prefetched for the context are returned if there are some. Records
+        are then yielded through a window of `child_stream_workers` records, and the
+        records of the child streams which opt in with `prefetch_records` are
+        fetched for each record entering it. The records of GraphQL child streams
+        which opt in with `batch_partitions` are fetched for `graphql_batch_size`
+        records at once. Child streams drawing on another rate limit resource than
+        this stream are fetched ahead in the tap's pool for their resource, when
+        `quota_workers` is set. Child streams are still synced one after the other,
+        so that messages are written in the same order as without prefetching.
+        """
+        prefetched = self._pop_prefetched_records(context)
+        records = (
+            prefetched.result()
+            if prefetched is not None
+            else super().get_records(context)
+        )
+
+        tap: Any = self._tap
+        executor = (
+            tap.get_child_stream_executor()
+            if hasattr(tap, "get_child_stream_executor")
+            else None
+        )
+        selected_child_streams = [
+            child_stream
+            for child_stream in self.child_streams
+            if isinstance(child_stream, GitHubRestStream)
+            and (child_stream.selected or child_stream.has_selected_descendents)
+        ]
+        quota_executors = {
+            child_stream: self.get_quota_executor(child_stream)
+            for child_stream in selected_child_streams
+        }
+        pending_batches: dict[GitHubGraphqlStream, list[Context]] = {
+            child_stream: []
+            for child_stream in selected_child_streams
+            if isinstance(child_stream, GitHubGraphqlStream)
+            and child_stream.get_batch_size() > 1
+        }
+        # Batches are still fetched ahead without an executor, in the calling thread.
+        child_streams: list[tuple[GitHubRestStream, ThreadPoolExecutor]] = []
+        for child_stream in selected_child_streams:
+            child_executor = quota_executors[child_stream] or (
+                executor if child_stream.prefetch_records else None
+            )
+            if child_stream not in pending_batches and child_executor is not None:
+                child_streams.append((child_stream, child_executor))
+        if not child_streams and not pending_batches:
+            yield from records
+            # Only streams without child streams keep ETags, their records are
+            # all synced by now.
+            self.release_etags(context)
+            return
+
+        window_size = max(
+            [
+                self.config.get("child_stream_workers") or 1,
+                *(child_stream.get_batch_size() for child_stream in pending_batches),
+            ]
+        )
+        window: deque[tuple[dict[str, Any], list[Context]]] = deque()
+        prefetches: list[tuple[GitHubRestStream, str]] = []
+
+        def prefetch_batch(child_stream: GitHubGraphqlStream) -> None:
+            contexts = pending_batches[child_stream]
+            pending_batches[child_stream] = []
+            prefetches.extend(
+                (child_stream, key)
+                for key in child_stream.prefetch_batch(
+                    quota_executors[child_stream] or executor, contexts
+                )
+            )
+
+        def pop_record() -> dict[str, Any]:
+            record, child_contexts = window.popleft()
+            # The child streams of the record are about to be synced.
+            for child_stream, contexts in pending_batches.items():
+                if any(
+                    pending_context is child_context
+                    for pending_context in contexts
+                    for child_context in child_contexts
+                ):
+                    prefetch_batch(child_stream)
+            return record
+
+        try:
+            for record in records:
+                child_contexts: list[Context] = []
+                if self.stream_maps[0].get_filter_result(record):
+                    for child_context in self.generate_child_contexts(record, context):
+                        if child_context is None:
+                            continue
+                        child_contexts.append(child_context)
+                        for child_stream, child_executor in child_streams:
+                            key = child_stream.prefetch(child_executor, child_context)
+                            prefetches.append((child_stream, key))
+                        for child_stream, contexts in pending_batches.items():
+                            contexts.append(child_context)
+                            if len(contexts) >= child_stream.get_batch_size():
+                                prefetch_batch(child_stream)
+                window.append((record, child_contexts))
+                if len(window) > window_size:
+                    yield pop_record()
+            while window:
+                yield pop_record()
+        finally:
+            # Drop what was not synced, e.g. when the sync failed.
+            for child_stream, key in prefetches:
+                future = child_stream._pop_prefetched_records(key=key)
+                if future is not None:
+                    future.cancel()
+
+    @property
+    def rate_limit_resource(self) -> str:
+        """The rate limit resource (core, graphql, search...) the stream draws on."""
+        return get_rate_limit_resource(f"{self.url_base}{self.path or ''}")
+
+    def get_quota_executor(
+        self,
+        child_stream: GitHubRestStream,
+    ) -> ThreadPoolExecutor | None:
+        """Return the tap's pool for the resource of a child stream.
+
+        Returns None if the child stream draws on the resource of this stream, or
+        unless `quota_workers` is set.
+        """
+        tap: Any = self._tap
+        if child_stream.rate_limit_resource == self.rate_limit_resource or not hasattr(
+            tap, "get_quota_executor"
+        ):
+            return None
+        return tap.get_quota_executor(child_stream.rate_limit_resource)
+
+    def prefetch(self, executor: ThreadPoolExecutor, context: Context) -> str:
+        """Start fetching the records of a context, and return its prefetch key.
+
+        Only the records of the endpoint are fetched ahead, overrides of
+        `get_records` still apply to them when the stream is synced. The starting
+        replication value of the context is written first, as the stream would
+        when synced, so that the records are fetched from the bookmark.
+        """
+
+        def fetch_records() -> list[dict]:
+            return list(super(GitHubRestStream, self).get_records(context))
+
+        key = self._get_prefetch_key(context)
+        with self._prefetched_records_lock:
+            if key not in self._prefetched_records:
+                self._write_starting_replication_value(context)
+                self._prefetched_records[key] = executor.submit(fetch_records)
+        return key
+
+    def _pop_prefetched_records(
+        self,
+        context: Context | None = None,
+        key: str | None = None,
+    ) -> Future[list[dict]] | None:
+        if key is None:
+            if context is None or not self._prefetched_records:
+                return None
+            key = self._get_prefetch_key(context)
+        with self._prefetched_records_lock:
+            return self._prefetched_records.pop(key, None)
+
+    @staticmethod
+    def _get_prefetch_key(context: Context) -> str:
+        return json.dumps(context, sort_keys=True, default=str)
 
 
 class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
     """GitHub Graphql stream class."""
 
+    # Set to True on child streams whose query has a single root field besides
+    # `rateLimit`, so that when `graphql_batch_size` is set, the partitions of
+    # several parent records are fetched with one query, each under an alias.
+    batch_partitions = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__init__(*args, **kwargs)
+        # The `first` arguments of the query are scaled down from their value by
+        # the page size, and `graphql_batch_size` by the batch size, when GitHub
+        # struggles with them.
+        self.page_size = AdaptiveSize(self.MAX_PER_PAGE)
+        self.batch_size = AdaptiveSize(self.config.get("graphql_batch_size") or 1)
+
     @property
     def url_base(self) -> str:
         return f"{self.config.get('api_url_base', self.DEFAULT_API_BASE_URL)}/graphql"
@@ -328,7 +1109,7 @@ class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
         .. _requests.Response:
             https://docs.python-requests.org/en/latest/api/#requests.Response
         """
-        resp_json = response.json()
+        resp_json = decode_json(response)
         yield from extract_jsonpath(self.query_jsonpath, input=resp_json)
 
     def get_next_page_token(
@@ -344,28 +1125,22 @@ class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
 
         X should be an integer between 0 and 9, increasing with query depth.
 
+        The paths of these fields are found once per query, and read directly from
+        the response.
+
         Warning - we recommend to avoid using deep (nested) pagination.
         """
 
-        resp_json = response.json()
+        resp_json = decode_json(response)
+        pagination_paths = compile_pagination_paths(self.query)
 
         # Find if results contains "hasNextPage_X" flags and if any are True.
         # If so, set nextPageCursor_X to endCursor_X for X max.
-
-        next_page_results = nested_lookup(
-            key="hasNextPage_",
-            document=resp_json,
-            wild=True,
-            with_keys=True,
-        )
-
-        has_next_page_indices: list[int] = []
-        # Iterate over all the items and filter items with hasNextPage = True.
-        for key, value in next_page_results.items():
-            # Check if key is even then add pair to new dictionary
-            if any(value):
-                pagination_index = int(str(key).split("_")[1])
-                has_next_page_indices.append(pagination_index)
+        has_next_page_indices: list[int] = [
+            pagination_index
+            for pagination_index, paths in pagination_paths.items()
+            if any(find_values(resp_json, paths.has_next_page))
+        ]
 
         # Check if any "hasNextPage" is True. Otherwise, exit early.
         if not len(has_next_page_indices) > 0:
@@ -384,9 +1159,8 @@ class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
                 next_page_cursors[key] = value
 
         # Get the pagination cursor to update and increment it.
-        next_page_end_cursor_results = nested_lookup(
-            key=f"endCursor_{max_pagination_index}",
-            document=resp_json,
+        next_page_end_cursor_results = find_values(
+            resp_json, pagination_paths[max_pagination_index].end_cursor
         )
 
         next_page_key = f"nextPageCursor_{max_pagination_index}"
@@ -414,6 +1188,139 @@ class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
 
         return params
 
+    def prepare_request_payload(
+        self,
+        context: Context | None,
+        next_page_token: Any | None,  # noqa: ANN401
+    ) -> dict | None:
+        payload = super().prepare_request_payload(context, next_page_token)
+        if payload is not None:
+            payload["query"] = self.scale_page_sizes(payload["query"])
+        return payload
+
+    def scale_page_sizes(self, query: str) -> str:
+        """Scale the `first` arguments of a query to the current page size."""
+        if self.page_size.value == self.page_size.maximum:
+            return query
+        return re.sub(
+            r"\bfirst:\s*(\d+)",
+            lambda match: f"first: {self.page_size.scale(int(match[1]))}",
+            query,
+        )
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        """Send a request, and adapt the page size to how GitHub coped with it.
+
+        The query is only sent with a token which has the points it should cost
+        left. Pages get smaller after a failure or a slow or costly response, and
+        grow back after fast and cheap ones.
+        """
+        self.check_query_budget(prepared_request, context)
+        try:
+            response = super()._request(prepared_request, context)
+        except Exception as e:
+            # Retries are prepared again, with the smaller page size.
+            if is_sizing_error(e):
+                self.page_size.shrink()
+            raise
+        self.page_size.record_response(
+            response.elapsed.total_seconds(), self.get_response_cost(response)
+        )
+        return response
+
+    def check_query_budget(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> None:
+        """Switch to a token with at least as many points left as a query costs.
+
+        With `rate_limit_pacing` enabled, the request waits until a token has them.
+
+        Raises:
+            FatalAPIError: If no token has the points left, and pacing is disabled,
+                or if no token's quota is large enough for the query.
+        """
+        token_pool = self.authenticator.token_pool
+        if not token_pool.token_managers:
+            return
+        body = json.loads(prepared_request.body or "{}")
+        cost = estimate_query_cost(body.get("query", ""))
+        owner = context.get("org") if context else None
+        while True:
+            try:
+                available_at = token_pool.switch_to_token_with_calls(
+                    cost, GRAPHQL_RESOURCE, owner
+                )
+            except ValueError as e:
+                raise FatalAPIError(
+                    f"A GraphQL query estimated to cost {cost} points exceeds the "
+                    "quota of every GitHub token."
+                ) from e
+            if available_at is None:
+                return
+            if not self.config.get("rate_limit_pacing"):
+                raise FatalAPIError(
+                    f"A GraphQL query estimated to cost {cost} points exceeds what "
+                    "GitHub tokens have left, the next one resets at "
+                    f"{available_at}."
+                )
+            delay = (available_at - datetime.now(tz=timezone.utc)).total_seconds()
+            self.logger.warning(
+                "No GitHub token has the %d points a GraphQL query is estimated to "
+                "cost. Waiting %.0fs until %s.",
+                cost,
+                delay,
+                available_at,
+            )
+            time.sleep(max(delay, 0))
+
+    @staticmethod
+    def get_response_cost(response: requests.Response) -> int:
+        costgen = extract_jsonpath("$.data.rateLimit.cost", input=decode_json(response))
+        return int(next(costgen, 0) or 0)
+
+    def update_rate_limit(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> None:
+        """Update token rate limit info, tokens are rotated when needed.
+
+        The `rateLimit` selected by the query stands in for the rate limit headers
+        when a response has none, e.g. behind some proxies.
+        """
+        headers = response.headers
+        rate_limit = next(
+            extract_jsonpath("$.data.rateLimit", input=decode_json(response)), None
+        )
+        token = self.authenticator.get_request_token(request)
+        token_manager = self.authenticator.token_pool.get_token_manager(token)
+        if (
+            "X-RateLimit-Remaining" not in headers
+            and isinstance(rate_limit, dict)
+            and rate_limit.get("remaining") is not None
+            and rate_limit.get("resetAt")
+            and token_manager is not None
+        ):
+            limit = token_manager.get_rate_limit(GRAPHQL_RESOURCE).limit
+            headers = requests.structures.CaseInsensitiveDict(
+                {
+                    "X-RateLimit-Resource": GRAPHQL_RESOURCE,
+                    "X-RateLimit-Limit": str(limit),
+                    "X-RateLimit-Remaining": str(rate_limit["remaining"]),
+                    "X-RateLimit-Reset": str(
+                        int(parse(rate_limit["resetAt"]).timestamp())
+                    ),
+                    "X-RateLimit-Used": str(limit - rate_limit["remaining"]),
+                }
+            )
+        self.authenticator.update_rate_limit(headers, token=token)
+
     def calculate_sync_cost(
         self,
         request: requests.PreparedRequest,
@@ -421,14 +1328,13 @@ class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
         context: dict | None,
     ) -> dict[str, int]:
         """Return the cost of the last graphql API call."""
-        costgen = extract_jsonpath("$.data.rateLimit.cost", input=response.json())
+        self.update_rate_limit(request, response)
         # calculate_sync_cost is called before the main response parsing.
         # In some cases, the tap crashes here before we have been able to
         # properly analyze where the error comes from, so we ignore these
         # costs to allow figuring out what happened downstream, by setting
         # them to 0.
-        cost = next(costgen, 0)
-        return {"rest": 0, "graphql": int(cost), "search": 0}
+        return {"rest": 0, "graphql": self.get_response_cost(response), "search": 0}
 
     def validate_response(self, response: requests.Response) -> None:
         """Validate HTTP response.
@@ -442,12 +1348,296 @@ class GitHubGraphqlStream(GraphQLStream, GitHubRestStream):
         Args:
             response: A `requests.Response`_ object.
 
+        Errors of some of the partitions of a batched query are left to
+        `request_batch_records`, which retries them, and errors reporting that the
+        query timed out are retried.
+
         Raises:
             FatalAPIError: If the request is not retriable.
             RetriableAPIError: If the request is retriable.
         """
         super().validate_response(response)
-        rj = response.json()
-        if "errors" in rj:
-            msg = rj["errors"]
-            raise FatalAPIError(f"Graphql error: {msg}", response)
+        rj = decode_json(response)
+        if "errors" not in rj:
+            return
+        msg = rj["errors"]
+        if rj.get("data") and all(
+            self.get_batch_index(error) is not None for error in msg
+        ):
+            return
+        if any("timeout" in str(error.get("message", "")).lower() for error in msg):
+            raise QueryTimeoutError(f"Graphql error: {msg}", response)
+        if any(error.get("type") in QUERY_TOO_LARGE_ERROR_TYPES for error in msg):
+            raise QueryTooLargeError(f"Graphql error: {msg}", response)
+        raise FatalAPIError(f"Graphql error: {msg}", response)
+
+    @staticmethod
+    def get_batch_index(error: dict) -> int | None:
+        """Return the index of the partition of a batched query an error is about."""
+        path = error.get("path") or [None]
+        match = re.fullmatch(r"p(\d+)", str(path[0]))
+        return int(match[1]) if match else None
+
+    def get_batch_size(self) -> int:
+        """Return the number of partitions to fetch with one query."""
+        if not self.batch_partitions:
+            return 1
+        return min(self.batch_size.value, self.get_affordable_batch_size())
+
+    def get_affordable_batch_size(self) -> int:
+        """Return the number of partitions a token has the points to query at once.
+
+        This only gets below `graphql_batch_size` when tokens run out of points.
+        """
+        points = max(
+            (
+                token_manager.calls_remaining(GRAPHQL_RESOURCE)
+                for token_manager in self.authenticator.token_pool.token_managers
+            ),
+            default=0,
+        )
+        requests_per_partition = max(count_connection_requests(self.query), 1)
+        return max(points * 100 // requests_per_partition, 1)
+
+    def parse_query(self) -> tuple[str, str, str]:
+        """Return the name, variable definitions and root field of the query.
+
+        The root field comes with its arguments and selections.
+        """
+        match = re.match(
+            r"\s*query\s+(\w+)\s*\(([^)]*)\)\s*{(.*)}\s*$", self.query, re.DOTALL
+        )
+        if match is None:
+            raise ValueError(f"Cannot batch the query of stream '{self.name}'.")
+        name, variable_definitions, selection = match.groups()
+        root_field = re.sub(r"\brateLimit\s*{[^}]*}", "", selection).strip()
+        return name, variable_definitions, root_field
+
+    def get_batch_query(self, aliases: Iterable[str]) -> str:
+        """Return the query of the stream repeated under each alias.
+
+        The variables of each alias are prefixed with it, e.g. `$repo` becomes
+        `$p0_repo` under the alias `p0`.
+        """
+        name, variable_definitions, root_field = self.parse_query()
+        batch_variable_definitions = []
+        batch_root_fields = []
+        for alias in aliases:
+            batch_variable_definitions.append(
+                re.sub(r"\$(\w+)", rf"${alias}_\1", variable_definitions)
+            )
+            batch_root_fields.append(
+                f"{alias}: " + re.sub(r"\$(\w+)", rf"${alias}_\1", root_field)
+            )
+        return (
+            f"query {name}Batch({' '.join(batch_variable_definitions)}) {{\n"
+            + "\n".join(batch_root_fields)
+            + "\nrateLimit { cost remaining resetAt }\n}"
+        )
+
+    def prefetch_batch(
+        self,
+        executor: ThreadPoolExecutor | None,
+        contexts: list[Context],
+    ) -> list[str]:
+        """Start fetching the records of several contexts, and return their keys.
+
+        The records are fetched in the calling thread if there is no executor. The
+        starting replication value of each context is written first, like in
+        `prefetch`.
+        """
+        batch: list[tuple[Context, Future[list[dict]]]] = []
+        keys = []
+        with self._prefetched_records_lock:
+            for context in contexts:
+                key = self._get_prefetch_key(context)
+                keys.append(key)
+                if key not in self._prefetched_records:
+                    self._write_starting_replication_value(context)
+                    future: Future[list[dict]] = Future()
+                    self._prefetched_records[key] = future
+                    batch.append((context, future))
+
+        if batch and executor is None:
+            self._fetch_batch(batch)
+        elif batch and executor is not None:
+            executor.submit(self._fetch_batch, batch)
+        return keys
+
+    def _fetch_batch(self, batch: list[tuple[Context, Future[list[dict]]]]) -> None:
+        # Skip the contexts whose records were dropped in the meantime.
+        batch = [
+            (context, future)
+            for context, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if batch:
+            self._resolve_batch(batch)
+
+    def _resolve_batch(self, batch: list[tuple[Context, Future[list[dict]]]]) -> None:
+        # The contexts whose records did not come yet, by index.
+        pending = dict(enumerate(batch))
+        try:
+            for index, records in self.request_batch_records(
+                [context for context, _ in batch]
+            ):
+                pending.pop(index)[1].set_result(records)
+        except Exception as e:
+            unresolved = list(pending.values())
+            if len(unresolved) == 1 or not is_sizing_error(e):
+                for _, future in unresolved:
+                    future.set_exception(e)
+                return
+            # Smaller queries stand a better chance after a timeout, unlike after
+            # a rate limit.
+            self.batch_size.shrink(len(unresolved))
+            self.logger.info(
+                "Splitting a batch of %d partitions of stream '%s' in two after an "
+                "error: %s",
+                len(unresolved),
+                self.name,
+                e,
+            )
+            middle = len(unresolved) // 2
+            self._resolve_batch(unresolved[:middle])
+            self._resolve_batch(unresolved[middle:])
+
+    def request_batch_records(
+        self,
+        contexts: list[Context],
+    ) -> Iterable[tuple[int, list[dict]]]:
+        """Yield the records of several contexts, fetched with batched queries.
+
+        Each context is queried under its own alias, and paginated with its own
+        cursors until it has no more pages. Its records are then yielded with its
+        index, while the other contexts are still paginated. Records are
+        post-processed like those of `get_records`. The contexts whose queries
+        failed while others succeeded are retried one at a time, from their first
+        page, once the others are done.
+        """
+        # The records of each context with pages left, by index.
+        records: dict[int, list[dict]] = {index: [] for index in range(len(contexts))}
+        # The errors of each context whose query failed, by index.
+        failed: dict[int, list[dict]] = {}
+        # The next page token of each context with pages left, by index.
+        next_page_tokens: dict[int, Any] = dict.fromkeys(range(len(contexts)))
+        # Route the request to the installation of the owner when there is one.
+        owners = {context.get("org") for context in contexts}
+        request_context = {"org": owners.pop()} if len(owners) == 1 else None
+
+        def request_batch(
+            page_tokens: dict[int, Any],
+        ) -> tuple[requests.PreparedRequest, requests.Response]:
+            # Like `request_page`, every retry is prepared again.
+            prepared_request = self.prepare_batch_request(contexts, page_tokens)
+            return prepared_request, self._request(prepared_request, request_context)
+
+        decorated_request_batch = self.request_decorator(request_batch)
+
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            while next_page_tokens:
+                prepared_request, response = decorated_request_batch(next_page_tokens)
+                request_counter.increment()
+                self.update_sync_costs(prepared_request, response, request_context)
+                self.batch_size.record_response(
+                    response.elapsed.total_seconds(), self.get_response_cost(response)
+                )
+                response_json = decode_json(response)
+                for error in response_json.get("errors", []):
+                    index = self.get_batch_index(error)
+                    if index is not None:
+                        failed.setdefault(index, []).append(error)
+                        records.pop(index, None)
+                if failed and len(contexts) == 1:
+                    msg = response_json["errors"]
+                    raise FatalAPIError(f"Graphql error: {msg}", response)
+                data = response_json["data"]
+
+                page_tokens, next_page_tokens = next_page_tokens, {}
+                for index, page_token in page_tokens.items():
+                    if index in failed:
+                        continue
+                    context = contexts[index]
+                    partition_response = self.get_partition_response(
+                        response, data[f"p{index}"], context, page_token
+                    )
+                    page_records = list(self.parse_response(partition_response))
+                    if not page_records:
+                        yield index, records.pop(index)
+                        continue
+                    for record in page_records:
+                        processed_record = self.post_process(record, dict(context))
+                        if processed_record is not None:
+                            records[index].append(processed_record)
+                    next_page_token = self.get_next_page_token(
+                        partition_response, page_token
+                    )
+                    if next_page_token and next_page_token == page_token:
+                        raise RuntimeError(
+                            "Loop detected in pagination. Pagination token "
+                            f"{next_page_token} is identical to prior token."
+                        )
+                    if next_page_token:
+                        next_page_tokens[index] = next_page_token
+                    else:
+                        yield index, records.pop(index)
+
+        for index in failed:
+            for _, context_records in self.request_batch_records([contexts[index]]):
+                yield index, context_records
+
+    def prepare_batch_request(
+        self,
+        contexts: list[Context],
+        page_tokens: dict[int, Any],
+    ) -> requests.PreparedRequest:
+        """Prepare the query of the contexts with pages left, by index."""
+        _, variable_definitions, _ = self.parse_query()
+        # Only pass the variables the query declares, GitHub rejects the others.
+        variable_names = re.findall(r"\$(\w+)\s*:", variable_definitions)
+        variables = {}
+        for index, page_token in page_tokens.items():
+            params = self.get_url_params(dict(contexts[index]), page_token)
+            for name in variable_names:
+                variables[f"p{index}_{name}"] = params.get(name)
+        return self.build_prepared_request(
+            method=self.http_method,
+            url=self.url_base,
+            headers=self.http_headers,
+            json={
+                "query": self.scale_page_sizes(
+                    self.get_batch_query(f"p{index}" for index in page_tokens)
+                ),
+                "variables": variables,
+            },
+        )
+
+    def get_partition_response(
+        self,
+        response: requests.Response,
+        partition_data: Any,  # noqa: ANN401
+        context: Context,
+        page_token: Any | None,  # noqa: ANN401
+    ) -> requests.Response:
+        """Return the part of a batched response for one context.
+
+        It reads as the response to the query of the context alone. Its request
+        carries the URL parameters of the context, where streams look for the
+        `since` of an incremental sync.
+        """
+        _, _, root_field = self.parse_query()
+        root_field_name = re.match(r"\w+", root_field)
+        partition_response = requests.Response()
+        partition_response.status_code = response.status_code
+        partition_response.headers = response.headers
+        partition_response.url = response.url
+        partition_response.request = requests.Request(
+            self.http_method,
+            self.url_base,
+            params=self.get_url_params(dict(context), page_token),
+        ).prepare()
+        set_decoded_json(
+            partition_response,
+            {"data": {root_field_name[0] if root_field_name else "": partition_data}},
+        )
+        return partition_response
@@ -0,0 +1,70 @@
+"""Decode the JSON body of a response once, with the fastest decoder available."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import requests
+
+_DECODED_JSON_ATTR = "_tap_github_decoded_json"
+_MISSING = object()
+
+_loads: Callable[[bytes], Any] | None = None
+_decode_errors: tuple[type[Exception], ...] = ()
+
+
+def _get_loads() -> Callable[[bytes], Any]:
+    """Return the decoder of orjson or msgspec if either is installed."""
+    global _loads, _decode_errors
+    if _loads is not None:
+        return _loads
+
+    try:
+        # Optional dependency:
+        import orjson
+    except ImportError:
+        try:
+            # Optional dependency:
+            import msgspec
+        except ImportError:
+            import json
+
+            _loads, _decode_errors = json.loads, (ValueError,)
+        else:
+            _loads, _decode_errors = msgspec.json.decode, (msgspec.DecodeError,)
+    else:
+        _loads, _decode_errors = orjson.loads, (orjson.JSONDecodeError,)
+    return _loads
+
+
+def decode_json(response: requests.Response) -> Any:  # noqa: ANN401
+    """Return the decoded JSON body of a response, decoding it on the first call.
+
+    Streams look at a response several times (to validate it, to count its cost, to
+    parse its records and to find the next page), so it is decoded only once. The
+    payload is shared: it must not be changed other than by the records parsed out
+    of it.
+
+    Raises:
+        requests.JSONDecodeError: If the body is not JSON, as `response.json()`.
+    """
+    decoded_json = getattr(response, _DECODED_JSON_ATTR, _MISSING)
+    if decoded_json is not _MISSING:
+        return decoded_json
+
+    loads = _get_loads()
+    try:
+        decoded_json = loads(response.content)
+    except _decode_errors:
+        # e.g. an empty body or another encoding than UTF-8, which requests handles
+        decoded_json = response.json()
+    setattr(response, _DECODED_JSON_ATTR, decoded_json)
+    return decoded_json
+
+
+def set_decoded_json(response: requests.Response, decoded_json: Any) -> None:  # noqa: ANN401
+    """Set the decoded JSON body of a response built from another one's payload."""
+    setattr(response, _DECODED_JSON_ATTR, decoded_json)
@@ -0,0 +1,103 @@
+"""On-disk cache of ETags, to send conditional requests to the REST API."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from tap_github.token_cache import JSONFileCache
+
+if TYPE_CHECKING:
+    import logging
+    from pathlib import Path
+
+
+def normalize_url(url: str) -> str:
+    """Return a URL with a lowercase host and sorted query parameters."""
+    parsed_url = urlparse(url)
+    query = urlencode(sorted(parse_qsl(parsed_url.query, keep_blank_values=True)))
+    return parsed_url._replace(
+        scheme=parsed_url.scheme.lower(),
+        netloc=parsed_url.netloc.lower(),
+        query=query,
+        fragment="",
+    ).geturl()
+
+
+class ETagCache(JSONFileCache):
+    """The ETags of the responses of previous runs, keyed by normalized URL.
+
+    A request with the ETag of the last response in its `If-None-Match` header is
+    answered with a `304 Not Modified`, which does not count against the rate limit,
+    if the response did not change. Entries are kept in memory during a run, and
+    merged into the file when the tap exits. The least recently used entries are
+    evicted beyond `max_entries`.
+    """
+
+    DEFAULT_MAX_ENTRIES = 10000
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        super().__init__(path, logger=logger)
+        self.max_entries = max_entries or self.DEFAULT_MAX_ENTRIES
+        self.entries: dict[str, dict[str, Any]] = self.load()
+        self.updated_keys: set[str] = set()
+        self._entries_lock = threading.Lock()
+
+    @staticmethod
+    def get_key(url: str, accept: str | None = None) -> str:
+        # The media type is part of the key, as it changes the response.
+        return f"{accept or ''} {normalize_url(url)}"
+
+    def get_etag(self, url: str, accept: str | None = None) -> str | None:
+        key = self.get_key(url, accept)
+        with self._entries_lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry["used_at"] = time.time()
+            self.updated_keys.add(key)
+            return entry.get("etag")
+
+    def set_etag(self, url: str, etag: str, accept: str | None = None) -> None:
+        key = self.get_key(url, accept)
+        with self._entries_lock:
+            self.entries[key] = {"etag": etag, "used_at": time.time()}
+            self.updated_keys.add(key)
+
+    def discard(self, url: str, accept: str | None = None) -> None:
+        key = self.get_key(url, accept)
+        with self._entries_lock:
+            if self.entries.pop(key, None) is not None:
+                self.updated_keys.add(key)
+
+    def save(self) -> None:
+        """Merge the entries used or changed during the run into the file."""
+        with self._entries_lock:
+            updates = {key: self.entries.get(key) for key in self.updated_keys}
+            self.updated_keys = set()
+        if not updates:
+            return
+
+        with self.lock():
+            entries = self.load()
+            for key, entry in updates.items():
+                if entry is None:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = entry
+            if len(entries) > self.max_entries:
+                entries = dict(
+                    sorted(
+                        entries.items(),
+                        key=lambda item: item[1].get("used_at", 0),
+                        reverse=True,
+                    )[: self.max_entries]
+                )
+            self._write(entries)
@@ -0,0 +1,57 @@
+"""Estimate the rate limit cost of GraphQL queries before sending them."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from tap_github.graphql_pagination import tokenize_query
+
+# The page size GitHub assumes for a connection whose `first` or `last` argument is
+# a variable.
+DEFAULT_PAGE_SIZE = 100
+
+
+@lru_cache(maxsize=128)
+def count_connection_requests(query: str) -> int:
+    """Return the number of requests GitHub counts for the connections of a query.
+
+    A connection, i.e. a field with a `first` or `last` argument, takes a request
+    per node its parent connections may return, assuming they return full pages.
+    See https://docs.github.com/en/graphql/overview/rate-limits-and-node-limits-for-the-graphql-api
+    """
+    requests = 0
+    # The number of nodes each selection set entered may be repeated for.
+    multipliers = [1]
+    arguments_depth = 0
+    page_size: int | None = None
+    tokens = tokenize_query(query)
+    for before, previous, token in zip([None, None, *tokens], [None, *tokens], tokens):
+        if token == "(":
+            arguments_depth += 1
+        elif token == ")":
+            arguments_depth -= 1
+        elif arguments_depth:
+            if previous == ":" and before in ("first", "last"):
+                page_size = int(token) if token.isdigit() else DEFAULT_PAGE_SIZE
+        elif token == "{":
+            if page_size is not None:
+                requests += multipliers[-1]
+            multipliers.append(multipliers[-1] * (page_size or 1))
+            page_size = None
+        elif token == "}":
+            if len(multipliers) > 1:
+                multipliers.pop()
+            page_size = None
+        elif token not in (":", "@", "...") and previous != "@":
+            # A field, whose arguments come next.
+            page_size = None
+    return requests
+
+
+def estimate_query_cost(query: str) -> int:
+    """Return the rate limit points GitHub should charge for a query.
+
+    That is the number of requests of its connections divided by 100, rounded, and
+    at least 1.
+    """
+    return max(round(count_connection_requests(query) / 100), 1)
@@ -0,0 +1,105 @@
+"""Find the pagination fields of GraphQL queries once, and read them directly."""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+# Names, integers, the punctuation delimiting selections and arguments, and the
+# spread and directive markers. Strings and comments are matched to be skipped.
+_TOKEN_PATTERN = re.compile(
+    r'"(?:\\.|[^"\\])*"|#[^\n]*|\.\.\.|[_A-Za-z]\w*|\d+|[{}():@]'
+)
+_PAGINATION_KEY_PATTERN = re.compile(r"(hasNextPage|endCursor)_(\d+)")
+
+
+class PaginationPaths(NamedTuple):
+    """The response keys leading to the page info of a level of pagination."""
+
+    has_next_page: tuple[str, ...]
+    end_cursor: tuple[str, ...]
+
+
+def tokenize_query(query: str) -> list[str]:
+    """Return the tokens of a query which matter to its shape, without strings."""
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(query)
+        if not token.startswith(('"', "#"))
+    ]
+
+
+@lru_cache(maxsize=128)
+def compile_pagination_paths(query: str) -> dict[int, PaginationPaths]:
+    """Return the paths of the `hasNextPage_X` and `endCursor_X` fields of a query.
+
+    Paths start at `data` and are made of response keys, i.e. field aliases when
+    there are some. They are keyed by pagination index X, for levels of pagination
+    which select both fields.
+    """
+    paths: dict[str, tuple[str, ...]] = {}
+    # The response key of each selection set entered, None for inline fragments.
+    stack: list[str | None] = []
+    last_key: str | None = None
+    arguments_depth = 0
+    skip_names = 0
+    in_fragment = False
+    tokens = tokenize_query(query)
+    for previous_token, token in zip([None, *tokens], tokens):
+        if token == "(":
+            arguments_depth += 1
+        elif token == ")":
+            arguments_depth -= 1
+        elif arguments_depth:
+            continue
+        elif token == "{":
+            stack.append(None if in_fragment else last_key)
+            last_key, in_fragment = None, False
+        elif token == "}":
+            if stack:
+                stack.pop()
+            last_key = None
+        elif token == ":":
+            # The name before was an alias, it stays the response key.
+            skip_names = 1
+        elif token == "...":
+            in_fragment = True
+        elif token == "@":
+            skip_names = 1
+        elif skip_names:
+            skip_names -= 1
+        elif in_fragment:
+            # The type of an inline fragment is not a key, but a fragment spread
+            # ends with its name.
+            in_fragment = previous_token != "..." or token == "on"
+        else:
+            last_key = token
+            if _PAGINATION_KEY_PATTERN.fullmatch(token) and stack:
+                parents = [key for key in stack[1:] if key is not None]
+                paths[token] = ("data", *parents, token)
+
+    pagination_paths = {}
+    for key, has_next_page in paths.items():
+        match = _PAGINATION_KEY_PATTERN.fullmatch(key)
+        end_cursor = paths.get(f"endCursor_{match[2]}") if match else None
+        if match and match[1] == "hasNextPage" and end_cursor is not None:
+            pagination_paths[int(match[2])] = PaginationPaths(has_next_page, end_cursor)
+    return pagination_paths
+
+
+def find_values(document: Any, path: tuple[str, ...]) -> list[Any]:  # noqa: ANN401
+    """Return the values at a path of response keys, through lists of nodes."""
+    values = [document]
+    for key in path:
+        items = [
+            item
+            for value in values
+            for item in (value if isinstance(value, list) else [value])
+        ]
+        values = [
+            item[key]
+            for item in items
+            if isinstance(item, dict) and item.get(key) is not None
+        ]
+    return values
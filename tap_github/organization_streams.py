@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, Any, ClassVar
 from singer_sdk import typing as th  # JSON Schema typing helpers
 
 from tap_github.client import GitHubRestStream
+from tap_github.sharding import select_shard
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -22,7 +23,12 @@ class OrganizationStream(GitHubRestStream):
 
     @property
     def partitions(self) -> list[dict] | None:
-        return [{"org": org} for org in self.config["organizations"]]
+        return [
+            {"org": org}
+            for org in select_shard(
+                self.config["organizations"], self.config, key=lambda org: org
+            )
+        ]
 
     def get_child_context(self, record: dict, context: dict | None) -> dict:
         return {
@@ -0,0 +1,61 @@
+"""On-disk cache of the time partitions took to sync, to sort them on later runs."""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import TYPE_CHECKING, Any
+
+from tap_github.token_cache import JSONFileCache
+
+if TYPE_CHECKING:
+    import logging
+    from pathlib import Path
+
+
+class PartitionTimingsCache(JSONFileCache):
+    """The seconds each partition of a stream took to sync on previous runs.
+
+    Entries are keyed by stream name, then by partition. They are kept apart from
+    the Singer state, which only holds replication bookmarks. Timings are kept in
+    memory during a run, and merged into the file when the tap exits.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        super().__init__(path, logger=logger)
+        self.entries: dict[str, dict[str, Any]] = self.load()
+        self.updates: dict[str, dict[str, float]] = {}
+        self._entries_lock = threading.Lock()
+
+    @staticmethod
+    def get_key(partition: dict) -> str:
+        return json.dumps(partition, sort_keys=True, default=str)
+
+    def get_seconds(self, stream_name: str, partition: dict) -> float | None:
+        key = self.get_key(partition)
+        with self._entries_lock:
+            seconds = self.updates.get(stream_name, {}).get(key)
+            if seconds is None:
+                seconds = self.entries.get(stream_name, {}).get(key)
+            return seconds
+
+    def set_seconds(self, stream_name: str, partition: dict, seconds: float) -> None:
+        with self._entries_lock:
+            self.updates.setdefault(stream_name, {})[self.get_key(partition)] = seconds
+
+    def save(self) -> None:
+        """Merge the timings of the run into the file."""
+        with self._entries_lock:
+            updates, self.updates = self.updates, {}
+        if not updates:
+            return
+
+        with self.lock():
+            entries = self.load()
+            for stream_name, timings in updates.items():
+                entries[stream_name] = {**entries.get(stream_name, {}), **timings}
+            self._write(entries)
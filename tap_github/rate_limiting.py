@@ -0,0 +1,233 @@
+"""Classes to pace requests according to GitHub's rate limits."""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import logging
+    from collections.abc import Iterator
+
+    from tap_github.authenticator import TokenManager, TokenPool
+
+
+class RequestPacer:
+    """Spread the calls left on a rate limit resource evenly until its quota resets.
+
+    This is a token bucket, implemented as a generic cell rate algorithm, whose rate
+    is recomputed before every call from the rate limits of the pool's tokens: the
+    sum over tokens of the calls remaining above the buffer, divided by the time
+    left until that token resets.
+
+    When every token is exhausted, callers wait for the first reset instead of
+    failing.
+    """
+
+    # Number of calls which can be made back to back before pacing kicks in.
+    BURST = 10
+    # Seconds to wait past a reset time, to absorb clock skew with GitHub.
+    RESET_MARGIN = 1.0
+    # Only log waits longer than this many seconds.
+    LOG_WAIT_THRESHOLD = 10.0
+
+    def __init__(
+        self,
+        token_pool: TokenPool,
+        resource: str,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.token_pool = token_pool
+        self.resource = resource
+        self.logger = logger
+        self._lock = threading.Lock()
+        # Theoretical arrival time of the next call, on the monotonic clock.
+        self._next_call_at = 0.0
+
+    def get_sustainable_rate(self) -> float | None:
+        """Return the calls per second which can be sustained until quotas reset.
+
+        Returns:
+            None if a token has a fresh quota, which does not call for pacing yet.
+            0 if all tokens are exhausted.
+        """
+        now = datetime.now(tz=timezone.utc)
+        rate = 0.0
+        for token_manager in self.token_pool.token_managers:
+            rate_limit = token_manager.get_rate_limit(self.resource)
+            if rate_limit.reset is None or rate_limit.reset <= now:
+                return None
+            seconds_to_reset = max((rate_limit.reset - now).total_seconds(), 1.0)
+            rate += max(rate_limit.calls_remaining(), 0) / seconds_to_reset
+        return rate
+
+    def get_seconds_to_first_reset(self) -> float:
+        now = datetime.now(tz=timezone.utc)
+        resets = [
+            reset
+            for token_manager in self.token_pool.token_managers
+            if (reset := token_manager.get_rate_limit(self.resource).reset)
+        ]
+        if not resets:
+            return 0.0
+        return max((min(resets) - now).total_seconds(), 0.0) + self.RESET_MARGIN
+
+    def wait(self) -> float:
+        """Block until the next call can be made.
+
+        Returns:
+            The number of seconds waited.
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self.get_sustainable_rate()
+            if rate is None:
+                self._next_call_at = now
+                return 0.0
+
+            if rate == 0:
+                delay = self.get_seconds_to_first_reset()
+                self._next_call_at = now + delay
+                if self.logger:
+                    self.logger.warning(
+                        f"All GitHub tokens have hit their '{self.resource}' rate "
+                        f"limit. Waiting {delay:.0f}s until the first one resets."
+                    )
+            else:
+                interval = 1 / rate
+                next_call_at = max(self._next_call_at, now)
+                delay = max(next_call_at - now - (self.BURST - 1) * interval, 0.0)
+                self._next_call_at = next_call_at + interval
+                if self.logger and delay > self.LOG_WAIT_THRESHOLD:
+                    self.logger.info(
+                        f"Pacing '{self.resource}' calls to {rate:.2f}/s, "
+                        f"waiting {delay:.0f}s."
+                    )
+
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class SecondaryRateLimitGovernor:
+    """Govern how many requests are in flight, and back off from secondary limits.
+
+    GitHub's secondary rate limits kick in when a token makes too many concurrent
+    or rapid requests. When one is hit, only the offending token is put in
+    cooldown, for as long as the `Retry-After` or `X-RateLimit-Reset` headers say,
+    and the other tokens keep working.
+
+    The number of requests in flight is tuned with additive increase and
+    multiplicative decrease: the limit grows by one after a full window of
+    successful requests, and is halved whenever a secondary rate limit is hit.
+    """
+
+    DEFAULT_MAX_CONCURRENT_REQUESTS = 10
+    # Seconds to cool a token down for, when GitHub does not say how long to wait.
+    DEFAULT_COOLDOWN = 60.0
+    # Secondary rate limits hit less than this many seconds apart are treated as
+    # one event, so that the requests already in flight do not halve the limit again.
+    DECREASE_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        token_pool: TokenPool,
+        max_concurrent_requests: int | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.token_pool = token_pool
+        self.logger = logger
+        self.max_concurrent_requests = (
+            max_concurrent_requests or self.DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        self.concurrency_limit = float(self.max_concurrent_requests)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._last_decrease_at = 0.0
+
+    @contextlib.contextmanager
+    def request_slot(self) -> Iterator[None]:
+        """Hold one of the concurrency slots while a request is in flight."""
+        with self._condition:
+            while self.in_flight >= int(self.concurrency_limit):
+                self._condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
+
+    def record_success(self) -> None:
+        with self._condition:
+            if self.concurrency_limit < self.max_concurrent_requests:
+                self.concurrency_limit = min(
+                    self.concurrency_limit + 1 / self.concurrency_limit,
+                    self.max_concurrent_requests,
+                )
+                self._condition.notify_all()
+
+    def get_cooldown_until(self, response_headers: Any) -> datetime:  # noqa: ANN401
+        """Return when a request can be retried after a secondary rate limit."""
+        now = datetime.now(tz=timezone.utc)
+        retry_after = response_headers.get("Retry-After")
+        if retry_after is not None and str(retry_after).isdigit():
+            return now + timedelta(seconds=int(retry_after))
+        reset = response_headers.get("X-RateLimit-Reset")
+        if response_headers.get("X-RateLimit-Remaining") == "0" and reset:
+            return datetime.fromtimestamp(int(reset), tz=timezone.utc)
+        return now + timedelta(seconds=self.DEFAULT_COOLDOWN)
+
+    def record_secondary_rate_limit(
+        self,
+        token_manager: TokenManager | None,
+        response_headers: Any,  # noqa: ANN401
+    ) -> datetime:
+        """Cool the offending token down and lower the concurrency limit.
+
+        Returns:
+            The time at which the token can be used again.
+        """
+        cooldown_until = self.get_cooldown_until(response_headers)
+        if token_manager is not None:
+            with self.token_pool.lock:
+                token_manager.cool_down(cooldown_until)
+                self.token_pool.reschedule(token_manager)
+
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease_at > self.DECREASE_INTERVAL:
+                self._last_decrease_at = now
+                self.concurrency_limit = max(self.concurrency_limit / 2, 1.0)
+                if self.logger:
+                    self.logger.warning(
+                        "Hit a secondary rate limit, lowering concurrency to "
+                        f"{int(self.concurrency_limit)} requests and cooling the "
+                        f"token down until {cooldown_until}."
+                    )
+        return cooldown_until
+
+    def wait_for_cooldown(self, resource: str, owner: str | None = None) -> float:
+        """Wait until a token is out of cooldown, if all of them are cooling down.
+
+        Returns:
+            The number of seconds waited.
+        """
+        token_manager = self.token_pool.get_active_token(resource, owner)
+        if token_manager is None or token_manager.cooldown_until is None:
+            return 0.0
+        delay = (
+            token_manager.cooldown_until - datetime.now(tz=timezone.utc)
+        ).total_seconds()
+        if delay <= 0:
+            return 0.0
+        if self.logger:
+            self.logger.info(
+                f"All GitHub tokens are cooling down, waiting {delay:.0f}s."
+            )
+        time.sleep(delay)
+        return delay
@@ -11,6 +11,7 @@ from singer_sdk.exceptions import FatalAPIError
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 
 from tap_github.client import GitHubGraphqlStream, GitHubRestStream
+from tap_github.decoding import decode_json
 from tap_github.schema_objects import (
     files_object,
     label_object,
@@ -19,6 +20,8 @@ from tap_github.schema_objects import (
     user_object,
 )
 from tap_github.scraping import scrape_dependents, scrape_metrics
+from tap_github.sharding import select_shard
+from tap_github.sizing import request_in_chunks
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -33,6 +36,12 @@ class RepositoryStream(GitHubRestStream):
     # updated_at will be updated any time the repository object is updated,
     # e.g. when the description or the primary language of the repository is updated.
     replication_key = "updated_at"
+    fetch_pages_ahead = True
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
+        super().__init__(*args, **kwargs)
+        # Size of each repository by ID, fetched along with the IDs.
+        self._repository_sizes: dict[int, tuple] = {}
 
     def get_url_params(
         self,
@@ -96,9 +105,14 @@ class RepositoryStream(GitHubRestStream):
                 for i, repo in enumerate(self.repo_list):
                     chunks.append(
                         f'repo{i}: repository(name: "{repo[1]}", owner: "{repo[0]}") '
-                        "{ nameWithOwner databaseId }"
+                        "{ nameWithOwner databaseId diskUsage stargazerCount pushedAt "
+                        "openIssues: issues(states: OPEN) { totalCount } }"
                     )
-                return "query {" + " ".join(chunks) + " rateLimit { cost } }"
+                return (
+                    "query {"
+                    + " ".join(chunks)
+                    + " rateLimit { cost remaining resetAt } }"
+                )
 
             def validate_response(self, response: requests.Response) -> None:
                 """Allow some specific errors.
@@ -151,6 +165,12 @@ class RepositoryStream(GitHubRestStream):
                 repos_with_ids.append(
                     {"org": org, "repo": repo, "repo_id": record[item]["databaseId"]}
                 )
+                self._repository_sizes[record[item]["databaseId"]] = (
+                    record[item].get("diskUsage") or 0,
+                    (record[item].get("openIssues") or {}).get("totalCount") or 0,
+                    record[item].get("stargazerCount") or 0,
+                    record[item].get("pushedAt") or "",
+                )
         self.logger.info(f"Running the tap on {len(repos_with_ids)} repositories")
         return repos_with_ids
 
@@ -164,31 +184,52 @@ class RepositoryStream(GitHubRestStream):
         if "searches" in self.config:
             return [
                 {"search_name": s["name"], "search_query": s["query"]}
-                for s in self.config["searches"]
+                for s in select_shard(
+                    self.config["searches"], self.config, key=lambda s: s["name"]
+                )
             ]
 
         if "repositories" in self.config:
-            split_repo_names = [s.split("/") for s in self.config["repositories"]]
-            augmented_repo_list = []
-            # chunk requests to the graphql endpoint to avoid timeouts and other
-            # obscure errors that the api doesn't say much about. The actual limit
-            # seems closer to 1000, use half that to stay safe.
-            chunk_size = 500
+            split_repo_names = [
+                s.split("/")
+                for s in select_shard(
+                    self.config["repositories"], self.config, key=lambda s: s
+                )
+            ]
             list_length = len(split_repo_names)
             self.logger.info(f"Filtering repository list of {list_length} repositories")
-            for ndx in range(0, list_length, chunk_size):
-                augmented_repo_list += self.get_repo_ids(
-                    split_repo_names[ndx : ndx + chunk_size]
-                )
+            # chunk requests to the graphql endpoint to avoid timeouts and other
+            # obscure errors that the api doesn't say much about. The actual limit
+            # seems closer to 1000, start at half that and split chunks which fail.
+            augmented_repo_list = request_in_chunks(
+                split_repo_names, self.get_repo_ids, 500, self.logger
+            )
             self.logger.info(
                 f"Running the tap on {len(augmented_repo_list)} repositories"
             )
             return augmented_repo_list
 
         if "organizations" in self.config:
-            return [{"org": org} for org in self.config["organizations"]]
+            return [
+                {"org": org}
+                for org in select_shard(
+                    self.config["organizations"], self.config, key=lambda org: org
+                )
+            ]
         return None
 
+    def get_partition_cost(self, partition: dict) -> tuple:
+        """Return an estimate of the cost of syncing a repository.
+
+        After the time taken on the previous run, repositories are compared on their
+        size, then their number of open issues, of stargazers, and how recently they
+        were pushed to.
+        """
+        return (
+            *super().get_partition_cost(partition),
+            *self._repository_sizes.get(partition.get("repo_id", 0), ()),
+        )
+
     def get_child_context(self, record: dict, context: dict | None) -> dict:
         """Return a child context object from the record and optional provided context.
 
@@ -749,7 +790,7 @@ class LanguagesStream(GitHubRestStream):
         if response.status_code in self.tolerated_http_errors:
             return
 
-        languages_json = response.json()
+        languages_json = decode_json(response)
         for key, value in languages_json.items():
             yield {"language_name": key, "bytes": value}
 
@@ -1067,6 +1108,7 @@ class CommitsStream(GitHubRestStream):
     parent_stream_type = RepositoryStream
     state_partitioning_keys: ClassVar[list[str]] = ["repo", "org"]
     ignore_parent_replication_key = True
+    fetch_pages_ahead = True
 
     def post_process(self, row: dict, context: dict | None = None) -> dict:
         """
@@ -1361,6 +1403,7 @@ class PullRequestCommits(GitHubRestStream):
     primary_keys: ClassVar[list[str]] = ["node_id"]
     parent_stream_type = PullRequestsStream
     state_partitioning_keys: ClassVar[list[str]] = ["repo", "org"]
+    prefetch_records = True
 
     schema = th.PropertiesList(
         # Parent keys
@@ -1449,6 +1492,7 @@ class PullRequestDiffsStream(GitHubRestStream):
     parent_stream_type = PullRequestsStream
     ignore_parent_replication_key = False
     state_partitioning_keys: ClassVar[list[str]] = ["repo", "org"]
+    prefetch_records = True
     tolerated_http_errors: ClassVar[list[int]] = [406, 422, 502]
 
     @property
@@ -1478,7 +1522,7 @@ class PullRequestDiffsStream(GitHubRestStream):
     def validate_response(self, response: requests.Response) -> None:
         """Allow some specific errors."""
         if response.status_code in self.tolerated_http_errors:
-            contents = response.json()
+            contents = decode_json(response)
             self.logger.info(
                 "Skipping PR due to %d error: %s",
                 response.status_code,
@@ -1517,6 +1561,7 @@ class ReviewsStream(GitHubRestStream):
     parent_stream_type = PullRequestsStream
     ignore_parent_replication_key = False
     state_partitioning_keys: ClassVar[list[str]] = ["repo", "org"]
+    prefetch_records = True
 
     schema = th.PropertiesList(
         # Parent keys
@@ -1608,6 +1653,7 @@ class ContributorsStream(GitHubRestStream):
     ignore_parent_replication_key = True
     state_partitioning_keys: ClassVar[list[str]] = ["repo", "org"]
     tolerated_http_errors: ClassVar[list[int]] = [204]
+    fetch_pages_ahead = True
 
     schema = th.PropertiesList(
         # Parent keys
@@ -1637,7 +1683,7 @@ class ContributorsStream(GitHubRestStream):
     def validate_response(self, response: requests.Response) -> None:
         """Allow some specific errors."""
         if response.status_code == 403:
-            contents = response.json()
+            contents = decode_json(response)
             if (
                 contents["message"]
                 == "The history or contributor list is too large to list contributors for this repository via the API."  # noqa: E501
@@ -1660,6 +1706,7 @@ class AnonymousContributorsStream(GitHubRestStream):
     ignore_parent_replication_key = True
     state_partitioning_keys: ClassVar[list[str]] = ["repo", "org"]
     tolerated_http_errors: ClassVar[list[int]] = [204]
+    fetch_pages_ahead = True
 
     def get_url_params(
         self,
@@ -1702,6 +1749,7 @@ class StargazersStream(GitHubRestStream):
     replication_key = "starred_at"
     # GitHub is missing the "since" parameter on this endpoint.
     use_fake_since_parameter = True
+    fetch_pages_ahead = True
 
     def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
         super().__init__(*args, **kwargs)
@@ -1752,6 +1800,7 @@ class StargazersGraphqlStream(GitHubGraphqlStream):
     state_partitioning_keys: ClassVar[list[str]] = ["repo_id"]
     # The parent repository object changes if the number of stargazers changes.
     ignore_parent_replication_key = False
+    batch_partitions = True
 
     def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
         super().__init__(*args, **kwargs)
@@ -1792,7 +1841,9 @@ class StargazersGraphqlStream(GitHubGraphqlStream):
         # If since parameter is present, try to exit early by looking at the last "starred_at".  # noqa: E501
         # Noting that we are traversing in DESCENDING order by STARRED_AT.
         if since:
-            results = list(extract_jsonpath(self.query_jsonpath, input=response.json()))
+            results = list(
+                extract_jsonpath(self.query_jsonpath, input=decode_json(response))
+            )
             # If no results, return None to exit early.
             if len(results) == 0:
                 return None
@@ -1830,6 +1881,8 @@ class StargazersGraphqlStream(GitHubGraphqlStream):
             }
             rateLimit {
               cost
+              remaining
+              resetAt
             }
           }
         """  # noqa: E501
@@ -2046,7 +2099,7 @@ class WorkflowsStream(GitHubRestStream):
 
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows."""
-        yield from extract_jsonpath(self.records_jsonpath, input=response.json())
+        yield from extract_jsonpath(self.records_jsonpath, input=decode_json(response))
 
 
 class WorkflowRunsStream(GitHubRestStream):
@@ -2102,7 +2155,7 @@ class WorkflowRunsStream(GitHubRestStream):
 
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows."""
-        yield from extract_jsonpath(self.records_jsonpath, input=response.json())
+        yield from extract_jsonpath(self.records_jsonpath, input=decode_json(response))
 
     def get_child_context(self, record: dict, context: dict | None) -> dict:
         """Return a child context object from the record and optional provided context.
@@ -2129,6 +2182,7 @@ class WorkflowRunJobsStream(GitHubRestStream):
     parent_stream_type = WorkflowRunsStream
     ignore_parent_replication_key = False
     state_partitioning_keys: ClassVar[list[str]] = ["repo", "org", "run_id"]
+    prefetch_records = True
     records_jsonpath = "$.jobs[*]"
 
     schema = th.PropertiesList(
@@ -2177,7 +2231,7 @@ class WorkflowRunJobsStream(GitHubRestStream):
 
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows."""
-        yield from extract_jsonpath(self.records_jsonpath, input=response.json())
+        yield from extract_jsonpath(self.records_jsonpath, input=decode_json(response))
 
     def get_url_params(
         self,
@@ -2190,9 +2244,10 @@ class WorkflowRunJobsStream(GitHubRestStream):
 
     def _write_schema_message(self) -> None:
         """Write out a SCHEMA message with the stream schema."""
-        if not self._schema_emitted:
-            super()._write_schema_message()
-            self._schema_emitted = True
+        with self._state_lock:
+            if not self._schema_emitted:
+                super()._write_schema_message()
+                self._schema_emitted = True
 
 
 class ExtraMetricsStream(GitHubRestStream):
@@ -2321,6 +2376,7 @@ class DependenciesStream(GitHubGraphqlStream):
     parent_stream_type = RepositoryStream
     state_partitioning_keys: ClassVar[list[str]] = ["repo_id"]
     ignore_parent_replication_key = True
+    batch_partitions = True
 
     @property
     def http_headers(self) -> dict:
@@ -2391,6 +2447,8 @@ class DependenciesStream(GitHubGraphqlStream):
             }
             rateLimit {
               cost
+              remaining
+              resetAt
             }
           }
 
@@ -2429,12 +2487,14 @@ class DependenciesStream(GitHubGraphqlStream):
 class TrafficRestStream(GitHubRestStream):
     """Base class for Traffic Streams"""
 
+    prefetch_records = True
+
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         if response.status_code != 200:
             return
 
         """Parse the response and return an iterator of result rows."""
-        yield from extract_jsonpath(self.records_jsonpath, input=response.json())
+        yield from extract_jsonpath(self.records_jsonpath, input=decode_json(response))
 
     def validate_response(self, response: requests.Response) -> None:
         """Allow some specific errors.
@@ -2442,7 +2502,7 @@ class TrafficRestStream(GitHubRestStream):
         as we actually expect these in this stream when we don't have write permissions into it.
         """  # noqa: E501
         if response.status_code == 403:
-            contents = response.json()
+            contents = decode_json(response)
             if contents["message"] == "Resource not accessible by integration":
                 self.logger.info("Permissions missing to sync stream '%s'", self.name)
                 return
@@ -12,11 +12,12 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, cast
 from urllib.parse import urlparse
 
-import requests
+from tap_github.sessions import get_session
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
+    import requests
     from bs4 import NavigableString, Tag
 
 used_by_regex = re.compile(" {3}Used by ")
@@ -46,11 +47,9 @@ def _scrape_dependents(url: str, logger: logging.Logger) -> Iterable[dict[str, A
     # Optional dependency:
     from bs4 import BeautifulSoup
 
-    s = requests.Session()
-
     while url:
         logger.debug(url)
-        response = s.get(url)
+        response = get_session(url).get(url)
         soup = BeautifulSoup(response.content, "html.parser")
 
         repo_names = [
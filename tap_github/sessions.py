@@ -0,0 +1,260 @@
+"""HTTP sessions shared by the whole tap."""
+
+from __future__ import annotations
+
+import os
+import ssl
+import threading
+from typing import TYPE_CHECKING, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import (
+    DEFAULT_CA_BUNDLE_PATH,
+    get_encoding_from_headers,
+    select_proxy,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    import httpx
+
+HTTP_ENGINES = ("requests", "httpx")
+
+# The client certificate of a request, as requests takes it.
+Cert = Union[bytes, str, tuple[Union[bytes, str], Union[bytes, str]]]
+
+# Headers about the connection, which requests sets and HTTP/2 forbids.
+HOP_BY_HOP_HEADERS = frozenset(
+    ["connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"]
+)
+
+
+class HTTPXAdapter(BaseAdapter):
+    """Send the requests of a `requests.Session` with httpx.
+
+    When the h2 package is installed (with the `http2` extra), requests to a host
+    are multiplexed over HTTP/2, so that the requests in flight from all threads of
+    the tap share a single connection. Responses are turned back into
+    `requests.Response` objects, which streams validate and parse as usual.
+
+    The CA bundle, client certificate and proxy of each request, which requests
+    takes from the session and from the environment (such as `REQUESTS_CA_BUNDLE`
+    or `HTTPS_PROXY`), are those of an httpx client created for them.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int,
+        keep_alive: bool = True,
+        transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        super().__init__()
+        try:
+            # Optional dependency:
+            import h2  # noqa: F401
+        except ImportError:
+            self.http2 = False
+        else:
+            self.http2 = True
+
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.transport = transport
+        self.clients: dict[
+            tuple[bool | str, Cert | None, str | None], httpx.Client
+        ] = {}
+        self._clients_lock = threading.Lock()
+
+    def get_client(
+        self,
+        verify: bool | str,
+        cert: Cert | None,
+        proxy: str | None,
+    ) -> httpx.Client:
+        """Return the client sending requests with a CA bundle, certificate and proxy.
+
+        The environment is not read by httpx, requests already did.
+        """
+        # Optional dependency:
+        import httpx
+
+        key = (verify, cert, proxy)
+        with self._clients_lock:
+            if key not in self.clients:
+                self.clients[key] = httpx.Client(
+                    http2=self.http2,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_maxsize,
+                        max_keepalive_connections=(
+                            self.pool_maxsize if self.keep_alive else 0
+                        ),
+                    ),
+                    transport=self.transport,
+                    verify=self.get_ssl_context(verify, cert),
+                    proxy=proxy,
+                    trust_env=False,
+                )
+                # Only the headers of requests are sent, but for those of HTTP/1.1
+                # connections.
+                self.clients[key].headers.pop("Connection", None)
+            return self.clients[key]
+
+    @staticmethod
+    def get_ssl_context(verify: bool | str, cert: Cert | None) -> ssl.SSLContext:
+        """Return the SSL context matching the `verify` and `cert` of requests."""
+        if verify is False:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        elif isinstance(verify, str) and os.path.isdir(verify):
+            context = ssl.create_default_context(capath=verify)
+        else:
+            context = ssl.create_default_context(
+                cafile=verify if isinstance(verify, str) else DEFAULT_CA_BUNDLE_PATH
+            )
+        if isinstance(cert, tuple):
+            context.load_cert_chain(os.fsdecode(cert[0]), os.fsdecode(cert[1]))
+        elif cert:
+            context.load_cert_chain(os.fsdecode(cert))
+        return context
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: float | tuple[float, float] | tuple[float, None] | None = None,
+        verify: bool | str = True,
+        cert: Cert | None = None,
+        proxies: Mapping[str, str] | None = None,
+    ) -> requests.Response:
+        """Send a prepared request, raising the exceptions requests would."""
+        # Optional dependency:
+        import httpx
+
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            httpx_timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        else:
+            httpx_timeout = httpx.Timeout(timeout)
+
+        client = self.get_client(
+            verify, cert, select_proxy(request.url or "", dict(proxies or {}))
+        )
+        try:
+            response = client.request(
+                request.method or "GET",
+                request.url or "",
+                headers={
+                    name: value
+                    for name, value in request.headers.items()
+                    if name.lower() not in HOP_BY_HOP_HEADERS
+                },
+                content=request.body,
+                timeout=httpx_timeout,
+            )
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e, request=request) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request) from e
+        return self.build_response(request, response)
+
+    def build_response(
+        self,
+        request: requests.PreparedRequest,
+        httpx_response: httpx.Response,
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = httpx_response.status_code
+        response.reason = httpx_response.reason_phrase
+        response.headers = CaseInsensitiveDict(httpx_response.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        # httpx has already decoded the compressed body
+        response._content = httpx_response.content
+        response.url = str(httpx_response.url)
+        response.request = request
+        # requests.Session.send times the request itself.
+        return response
+
+    def close(self) -> None:
+        with self._clients_lock:
+            for client in self.clients.values():
+                client.close()
+            self.clients = {}
+
+
+class SessionPool:
+    """A `requests.Session` per host, shared by every stream and token of the tap.
+
+    Sessions keep the connections they open alive, so that requests to a host
+    (api.github.com, github.com or a GitHub Enterprise Server) reuse them instead of
+    paying for a TCP and TLS handshake each time.
+    """
+
+    # Connections kept open per host, which should cover the requests in flight.
+    DEFAULT_POOL_MAXSIZE = 10
+
+    def __init__(
+        self,
+        pool_maxsize: int | None = None,
+        keep_alive: bool = True,
+        engine: str = "requests",
+    ) -> None:
+        self.pool_maxsize = pool_maxsize or self.DEFAULT_POOL_MAXSIZE
+        self.keep_alive = keep_alive
+        self.engine = engine
+        self.sessions: dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        pool_maxsize: int | None = None,
+        keep_alive: bool | None = None,
+        engine: str | None = None,
+    ) -> None:
+        """Change the settings of the sessions, closing the ones already open."""
+        if engine is not None and engine not in HTTP_ENGINES:
+            raise ValueError(
+                f"Invalid `http_engine` {engine!r}, expected one of {HTTP_ENGINES}."
+            )
+        with self._lock:
+            self.pool_maxsize = pool_maxsize or self.DEFAULT_POOL_MAXSIZE
+            if keep_alive is not None:
+                self.keep_alive = keep_alive
+            if engine is not None:
+                self.engine = engine
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+
+    def get_session(self, url: str) -> requests.Session:
+        """Return the session for the host of a URL."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self.sessions:
+                self.sessions[host] = self.create_session()
+            return self.sessions[host]
+
+    def create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter: BaseAdapter
+        if self.engine == "httpx":
+            adapter = HTTPXAdapter(self.pool_maxsize, keep_alive=self.keep_alive)
+        else:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive and self.engine == "requests":
+            session.headers["Connection"] = "close"
+        return session
+
+
+default_session_pool = SessionPool()
+
+
+def get_session(url: str) -> requests.Session:
+    """Return the tap-wide session for the host of a URL."""
+    return default_session_pool.get_session(url)
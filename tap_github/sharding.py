@@ -0,0 +1,240 @@
+"""Split a sync across several processes of the tap, and merge their state.
+
+A shard is a process of the tap run with `shard_index` and `shard_count` in its
+config. It only syncs the repositories, organizations, searches or users whose key
+hashes to its index, with its share of the personal tokens.
+
+The shards can be run by hand, on one or several hosts, or by the supervisor of this
+module, which runs them on the local host and writes their messages as one stream:
+
+    python -m tap_github.sharding --workers 4 --config config.json --state state.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+T = TypeVar("T")
+
+
+def get_shard(key: str, shard_count: int) -> int:
+    """Return the shard of a key, the same in every process and on every host."""
+    digest = hashlib.sha256(key.lower().encode()).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def select_shard(
+    items: list[T],
+    config: Mapping[str, Any],
+    key: Callable[[T], str],
+) -> list[T]:
+    """Return the items of the shard a tap is configured for.
+
+    All items are returned if the tap is not sharded.
+    """
+    shard_count = config.get("shard_count") or 1
+    if shard_count < 2:
+        return items
+    shard_index = config.get("shard_index") or 0
+    return [item for item in items if get_shard(key(item), shard_count) == shard_index]
+
+
+def validate_shard_config(config: Mapping[str, Any]) -> None:
+    shard_count = config.get("shard_count") or 1
+    shard_index = config.get("shard_index") or 0
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(
+            f"Invalid shard: `shard_index` ({shard_index}) must be between 0 and "
+            f"`shard_count` ({shard_count}) - 1."
+        )
+
+
+def select_shard_tokens(tokens: Iterable[str], config: Mapping[str, Any]) -> set[str]:
+    """Return the personal tokens of the shard a tap is configured for.
+
+    Tokens are dealt to shards in turn, so that shards do not drain each other's
+    rate limits. When there are fewer tokens than shards, all shards share them.
+    """
+    sorted_tokens = sorted(tokens)
+    shard_count = config.get("shard_count") or 1
+    if shard_count < 2 or len(sorted_tokens) < shard_count:
+        return set(sorted_tokens)
+    shard_index = config.get("shard_index") or 0
+    return set(sorted_tokens[shard_index::shard_count])
+
+
+def _get_context_key(context: dict) -> str:
+    return json.dumps(context, sort_keys=True, default=str)
+
+
+def merge_states(base_state: dict, shard_states: Iterable[dict]) -> dict:
+    """Merge the states of shards into one bookmark document.
+
+    Every shard starts from the same state, and only changes the bookmarks of its
+    partitions. So a bookmark which differs from the starting state is taken from
+    the shard which changed it, and others are kept.
+    """
+    merged_state = copy.deepcopy(base_state)
+    base_bookmarks = base_state.get("bookmarks", {})
+    bookmarks = merged_state.setdefault("bookmarks", {})
+    for shard_state in shard_states:
+        for stream_name, stream_bookmark in shard_state.get("bookmarks", {}).items():
+            base_bookmark = base_bookmarks.get(stream_name, {})
+            merged_bookmark = bookmarks.setdefault(stream_name, {})
+
+            for key in base_bookmark.keys() - stream_bookmark.keys():
+                merged_bookmark.pop(key, None)
+            for key, value in stream_bookmark.items():
+                if key != "partitions" and value != base_bookmark.get(key):
+                    merged_bookmark[key] = copy.deepcopy(value)
+
+            base_partitions = {
+                _get_context_key(partition["context"]): partition
+                for partition in base_bookmark.get("partitions", [])
+            }
+            merged_partitions = {
+                _get_context_key(partition["context"]): partition
+                for partition in merged_bookmark.get("partitions", [])
+            }
+            for partition in stream_bookmark.get("partitions", []):
+                context_key = _get_context_key(partition["context"])
+                if partition != base_partitions.get(context_key):
+                    merged_partitions[context_key] = copy.deepcopy(partition)
+            if merged_partitions:
+                merged_bookmark["partitions"] = list(merged_partitions.values())
+    return merged_state
+
+
+class ShardSupervisor:
+    """Run a sync as several shards of the tap on the local host.
+
+    Messages of the shards are written to stdout as they come, one line at a time.
+    Their STATE messages are replaced by the merged state of all shards.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        config: dict,
+        state: dict | None = None,
+        catalog_path: str | None = None,
+        output: IO[str] | None = None,
+    ) -> None:
+        self.workers = workers
+        self.config = config
+        self.base_state = state or {}
+        self.catalog_path = catalog_path
+        self.output = output or sys.stdout
+        self.shard_states: dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    def get_shard_command(self, shard_index: int, tmp_dir: Path) -> list[str]:
+        config_path = tmp_dir / f"config-{shard_index}.json"
+        config_path.write_text(
+            json.dumps(
+                {**self.config, "shard_index": shard_index, "shard_count": self.workers}
+            )
+        )
+        os.chmod(config_path, 0o600)
+        command = [
+            sys.executable,
+            "-c",
+            "from tap_github.tap import cli; cli()",
+            "--config",
+            str(config_path),
+        ]
+        if self.base_state:
+            state_path = tmp_dir / "state.json"
+            state_path.write_text(json.dumps(self.base_state))
+            command += ["--state", str(state_path)]
+        if self.catalog_path:
+            command += ["--catalog", self.catalog_path]
+        return command
+
+    def write_merged_state(self) -> None:
+        state = merge_states(
+            self.base_state,
+            [self.shard_states[index] for index in sorted(self.shard_states)],
+        )
+        self.output.write(json.dumps({"type": "STATE", "value": state}) + "\n")
+        self.output.flush()
+
+    def forward_messages(self, shard_index: int, stdout: IO[str]) -> None:
+        for line in stdout:
+            message = json.loads(line)
+            with self._lock:
+                if message.get("type") == "STATE":
+                    self.shard_states[shard_index] = message["value"]
+                    self.write_merged_state()
+                else:
+                    self.output.write(line)
+                    self.output.flush()
+
+    def run(self) -> int:
+        """Run the shards until they all exit, and return the exit code."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processes = [
+                subprocess.Popen(
+                    self.get_shard_command(shard_index, Path(tmp_dir)),
+                    stdout=subprocess.PIPE,
+                    text=True,
+                )
+                for shard_index in range(self.workers)
+            ]
+            forwarders = [
+                threading.Thread(
+                    target=self.forward_messages,
+                    args=(shard_index, process.stdout),
+                    daemon=True,
+                )
+                for shard_index, process in enumerate(processes)
+            ]
+            for forwarder in forwarders:
+                forwarder.start()
+
+            exit_code = 0
+            for process in processes:
+                if process.wait() != 0 and exit_code == 0:
+                    exit_code = process.returncode
+                    # Stop the other shards, the state they reached is kept.
+                    for other_process in processes:
+                        other_process.terminate()
+            for forwarder in forwarders:
+                forwarder.join()
+
+        with self._lock:
+            if self.shard_states:
+                self.write_merged_state()
+        return exit_code
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run tap-github as several shards and merge their output."
+    )
+    parser.add_argument("--workers", type=int, required=True)
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--state")
+    parser.add_argument("--catalog")
+    args = parser.parse_args(argv)
+
+    config = json.loads(Path(args.config).read_text())
+    state = json.loads(Path(args.state).read_text()) if args.state else None
+    return ShardSupervisor(args.workers, config, state, args.catalog).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
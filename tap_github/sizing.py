@@ -0,0 +1,128 @@
+"""Sizes of GraphQL batches and pages which adapt to how GitHub copes with them."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, TypeVar
+
+import requests
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+
+if TYPE_CHECKING:
+    import logging
+    from collections.abc import Callable
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# The status codes GitHub answers with when a query timed out on its side.
+TIMEOUT_STATUS_CODES = (502, 504)
+
+
+class QueryTimeoutError(RetriableAPIError):
+    """A GraphQL query which GitHub reports as timed out, in a 200 response."""
+
+
+class QueryTooLargeError(FatalAPIError):
+    """A GraphQL query which GitHub refuses for the nodes or resources it needs."""
+
+
+def is_sizing_error(error: BaseException) -> bool:
+    """Return whether a smaller batch or page stands a better chance after an error.
+
+    That is when the request timed out or was too large for GitHub. Other errors,
+    such as rate limits, would not be helped by more requests.
+    """
+    if isinstance(
+        error,
+        (requests.exceptions.Timeout, QueryTimeoutError, QueryTooLargeError),
+    ):
+        return True
+    return (
+        isinstance(error, RetriableAPIError)
+        and error.response is not None
+        and error.response.status_code in TIMEOUT_STATUS_CODES
+    )
+
+
+class AdaptiveSize:
+    """A size between `minimum` and `maximum`, which starts at `maximum`.
+
+    The size is halved when a request fails, is slow or costly, and grows back by a
+    quarter when requests come back fast and cheap, like TCP's congestion window.
+    """
+
+    # Responses slower than this many seconds shrink the size. GitHub times out
+    # GraphQL queries after 10 seconds.
+    SLOW_SECONDS = 8.0
+    # Responses faster than this many seconds grow the size, if cheap.
+    FAST_SECONDS = 2.0
+    # Responses costing at least this many rate limit points shrink the size, and
+    # those costing less than half of it grow the size, if fast.
+    HIGH_COST = 100
+
+    def __init__(self, maximum: int, minimum: int = 1) -> None:
+        self.maximum = max(maximum, minimum)
+        self.minimum = minimum
+        self.value = self.maximum
+        self._lock = threading.Lock()
+
+    def shrink(self, size: int | None = None) -> int:
+        """Halve the size, or the given size if smaller, and return it."""
+        with self._lock:
+            self.value = max(min(self.value, size or self.value) // 2, self.minimum)
+            return self.value
+
+    def grow(self) -> int:
+        with self._lock:
+            self.value = min(self.value + max(self.value // 4, 1), self.maximum)
+            return self.value
+
+    def record_response(self, seconds: float, cost: int = 0) -> int:
+        """Adapt the size to the duration and cost of a response, and return it."""
+        if seconds >= self.SLOW_SECONDS or cost >= self.HIGH_COST:
+            return self.shrink()
+        if seconds < self.FAST_SECONDS and cost < self.HIGH_COST / 2:
+            return self.grow()
+        return self.value
+
+    def scale(self, size: int) -> int:
+        """Scale a size given for `maximum` to the current size."""
+        return max(size * self.value // self.maximum, 1)
+
+
+def request_in_chunks(
+    items: list[T],
+    request: Callable[[list[T]], list[R]],
+    max_chunk_size: int,
+    logger: logging.Logger | None = None,
+) -> list[R]:
+    """Return the results of requesting items a chunk at a time.
+
+    Chunks start at `max_chunk_size` items and adapt like an `AdaptiveSize`. A chunk
+    which fails with a sizing error (see `is_sizing_error`) is split in two, until
+    the failing item is requested alone, in which case the error is raised.
+    """
+    chunk_size = AdaptiveSize(max_chunk_size)
+    results: list[R] = []
+    start = 0
+    while start < len(items):
+        chunk = items[start : start + chunk_size.value]
+        started_at = time.monotonic()
+        try:
+            results += request(chunk)
+        except Exception as e:
+            if len(chunk) == 1 or not is_sizing_error(e):
+                raise
+            chunk_size.shrink(len(chunk))
+            if logger is not None:
+                logger.info(
+                    "Splitting a chunk of %d items in two after an error: %s",
+                    len(chunk),
+                    e,
+                )
+            continue
+        chunk_size.record_response(time.monotonic() - started_at)
+        start += len(chunk)
+    return results
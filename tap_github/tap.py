@@ -2,15 +2,29 @@
 
 from __future__ import annotations
 
+import atexit
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
 from singer_sdk import Stream, Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
 from singer_sdk.helpers._classproperty import classproperty
 
+from tap_github.authenticator import TokenPool
+from tap_github.etag_cache import ETagCache
+from tap_github.partition_timings import PartitionTimingsCache
+from tap_github.sessions import default_session_pool
+from tap_github.sharding import validate_shard_config
 from tap_github.streams import Streams
 
+if TYPE_CHECKING:
+    from singer_sdk._singerlib import Message
+
+    from tap_github.authenticator import GitHubTokenAuthenticator
+
 
 class TapGitHub(Tap):
     """Singer tap for the GitHub API."""
@@ -18,6 +32,33 @@ class TapGitHub(Tap):
     name = "tap-github"
     package_name = "meltanolabs-tap-github"
 
+    _token_pool: TokenPool | None = None
+    _token_pool_lock = threading.Lock()
+    _write_lock = threading.Lock()
+    _child_stream_executor: ThreadPoolExecutor | None = None
+    _child_stream_executor_lock = threading.Lock()
+    _quota_executors_lock = threading.Lock()
+    _etag_cache: ETagCache | None = None
+    _etag_cache_lock = threading.Lock()
+    _partition_timings: PartitionTimingsCache | None = None
+    _partition_timings_lock = threading.Lock()
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Initialize the tap, and size the HTTP connection pools from its config."""
+        super().__init__(*args, **kwargs)
+        self._quota_executors: dict[str, ThreadPoolExecutor] = {}
+        validate_shard_config(self.config)
+        default_session_pool.configure(
+            pool_maxsize=self.config.get("http_pool_maxsize"),
+            keep_alive=self.config.get("http_keep_alive"),
+            engine=self.config.get("http_engine"),
+        )
+
+    def write_message(self, message: Message) -> None:
+        """Write a message, one at a time when partitions are synced concurrently."""
+        with self._write_lock:
+            super().write_message(message)
+
     @classproperty
     def logger(cls: type[TapGitHub]) -> logging.Logger:  # noqa: N805
         """Get logger.
@@ -62,6 +103,189 @@ class TapGitHub(Tap):
             th.IntegerType,
             description="Add a buffer to avoid consuming all query points for the token at hand. Defaults to 1000.",  # noqa: E501
         ),
+        th.Property(
+            "rate_limit_pacing",
+            th.BooleanType,
+            description=(
+                "Set to true to spread the calls left on each token's rate limit "
+                "evenly until it resets, and to wait for the first reset instead of "
+                "failing when all tokens are exhausted. Defaults to false."
+            ),
+        ),
+        th.Property(
+            "max_concurrent_requests",
+            th.IntegerType,
+            description=(
+                "The maximum number of requests in flight. The tap lowers it "
+                "when GitHub reports a secondary rate limit, and raises it back "
+                "gradually. Defaults to 10."
+            ),
+        ),
+        th.Property(
+            "partition_workers",
+            th.IntegerType,
+            description=(
+                "The number of partitions (such as repositories) to sync at once, "
+                "each with its child streams. Requests in flight are still capped by "
+                "`max_concurrent_requests`. Defaults to 1."
+            ),
+        ),
+        th.Property(
+            "partition_timings_path",
+            th.StringType,
+            description=(
+                "Path of a file in which to keep the time each partition took to "
+                "sync, so that later runs with `partition_workers` sync the slowest "
+                "partitions first. Disabled by default."
+            ),
+        ),
+        th.Property(
+            "child_stream_workers",
+            th.IntegerType,
+            description=(
+                "The number of requests for child streams with few records per "
+                "parent record (pull request commits, diffs and reviews, workflow "
+                "run jobs and traffic) to send ahead of time, for the current and "
+                "upcoming parent records. Records are still written in the same "
+                "order. Defaults to 1, which disables fetching ahead."
+            ),
+        ),
+        th.Property(
+            "page_workers",
+            th.IntegerType,
+            description=(
+                "The number of pages to request concurrently once the first page "
+                "of commits, contributors, stargazers or organization repositories "
+                "reveals the last one. Records are still written in page order. "
+                "Defaults to 1, which requests pages one after the other."
+            ),
+        ),
+        th.Property(
+            "read_ahead_pages",
+            th.IntegerType,
+            description=(
+                "The number of pages to request ahead, as soon as their token or "
+                "cursor is known, while the records of the previous pages are "
+                "processed. Defaults to 0, which disables reading ahead."
+            ),
+        ),
+        th.Property(
+            "graphql_batch_size",
+            th.IntegerType,
+            description=(
+                "The number of repositories or users whose stargazers, "
+                "dependencies or contributed repositories are fetched with one "
+                "GraphQL query, at most. Batches are split in two when they fail, and "
+                "shrink when GitHub is slow to answer them. Defaults to 1, which "
+                "sends a query per repository or user."
+            ),
+        ),
+        th.Property(
+            "quota_workers",
+            th.IntegerType,
+            description=(
+                "The number of requests for child streams drawing on another rate "
+                "limit quota than their parent (the GraphQL streams `stargazers`, "
+                "`dependencies` and `user_contributed_to`) to send ahead of time, "
+                "while the REST child streams are synced, so that both quotas are "
+                "used at once. Defaults to 0, which syncs them in turn."
+            ),
+        ),
+        th.Property(
+            "shard_count",
+            th.IntegerType,
+            description=(
+                "The number of shards a sync is split into. Each shard is a process "
+                "of the tap which syncs the repositories, organizations, searches "
+                "or users hashing to its `shard_index`, with its share of the "
+                "personal tokens. Defaults to 1."
+            ),
+        ),
+        th.Property(
+            "shard_index",
+            th.IntegerType,
+            description=(
+                "The shard synced by this process, between 0 and `shard_count` - 1. "
+                "Defaults to 0."
+            ),
+        ),
+        th.Property(
+            "conditional_requests",
+            th.BooleanType,
+            description=(
+                "Set to true to make the requests of incremental streams without "
+                "child streams conditional, on their bookmark and on the ETags kept "
+                "in `etag_cache_path`. They are answered with a `304 Not Modified` "
+                "not counting against the rate limit when the response did not "
+                "change. Defaults to false."
+            ),
+        ),
+        th.Property(
+            "etag_cache_path",
+            th.StringType,
+            description=(
+                "Path of a file in which to keep the ETags of REST API responses, "
+                "for `conditional_requests`. Disabled by default."
+            ),
+        ),
+        th.Property(
+            "etag_cache_max_entries",
+            th.IntegerType,
+            description=(
+                "The number of ETags kept in `etag_cache_path`, the least recently "
+                "used being evicted first. Defaults to 10000."
+            ),
+        ),
+        th.Property(
+            "http_pool_maxsize",
+            th.IntegerType,
+            description=(
+                "The number of connections to keep open to each host (the API, "
+                "github.com or a GitHub Enterprise Server), shared by all streams. "
+                "Defaults to 10."
+            ),
+        ),
+        th.Property(
+            "http_keep_alive",
+            th.BooleanType,
+            description=(
+                "Set to false to close connections after each request, instead of "
+                "reusing them. Defaults to true."
+            ),
+        ),
+        th.Property(
+            "http_engine",
+            th.StringType,
+            description=(
+                "The library sending HTTP requests: `requests`, or `httpx` which "
+                "multiplexes concurrent requests to a host over one HTTP/2 "
+                "connection when the tap is installed with its `http2` extra. "
+                "Defaults to `requests`."
+            ),
+            allowed_values=["requests", "httpx"],
+        ),
+        th.Property(
+            "token_cache_path",
+            th.StringType,
+            description=(
+                "Path of a file in which to cache whether each token is valid, and "
+                "the quota it has left, for 5 minutes. Runs of the tap sharing this "
+                "file skip validating tokens validated recently, and start from the "
+                "rate limits saved by the previous run. Tokens are stored "
+                "as SHA-256 hashes. Disabled by default."
+            ),
+        ),
+        th.Property(
+            "cache_app_tokens",
+            th.BooleanType,
+            description=(
+                "Set to true to store GitHub App installation tokens in "
+                "`token_cache_path`, so that runs of the tap reuse them until they "
+                "are due for refresh instead of minting new ones. The tokens are "
+                "stored in plain text, the file is only readable by its owner. "
+                "Defaults to false."
+            ),
+        ),
         th.Property(
             "expiry_time_buffer",
             th.IntegerType,
@@ -121,6 +345,93 @@ class TapGitHub(Tap):
         ),
     ).to_dict()
 
+    def get_token_pool(self, authenticator: GitHubTokenAuthenticator) -> TokenPool:
+        """Return the token pool shared by every stream of the tap.
+
+        The pool is prepared by the first authenticator which asks for it, so that
+        each token is validated only once per run.
+        """
+        with self._token_pool_lock:
+            if self._token_pool is None:
+                self._token_pool = TokenPool(
+                    authenticator.prepare_tokens(),
+                    logger=self.logger,
+                    max_concurrent_requests=self.config.get("max_concurrent_requests"),
+                    token_cache=authenticator.get_token_cache(),
+                )
+                # Save the rate limits of the tokens for later runs, when the tap
+                # exits. `sync_all` cannot be overridden to do so.
+                atexit.register(self._token_pool.save_rate_limits)
+            return self._token_pool
+
+    def get_child_stream_executor(self) -> ThreadPoolExecutor | None:
+        """Return the thread pool fetching child stream records ahead of their sync.
+
+        Returns None unless `child_stream_workers` is above 1.
+        """
+        child_stream_workers = self.config.get("child_stream_workers") or 1
+        if child_stream_workers < 2:
+            return None
+        with self._child_stream_executor_lock:
+            if self._child_stream_executor is None:
+                self._child_stream_executor = ThreadPoolExecutor(
+                    max_workers=child_stream_workers,
+                    thread_name_prefix="child-streams",
+                )
+            return self._child_stream_executor
+
+    def get_quota_executor(self, resource: str) -> ThreadPoolExecutor | None:
+        """Return the thread pool fetching child stream records ahead for a resource.
+
+        Child streams drawing on another rate limit resource than their parent, such
+        as GraphQL streams under REST ones, are fetched there. Returns None unless
+        `quota_workers` is set.
+        """
+        quota_workers = self.config.get("quota_workers") or 0
+        if quota_workers < 1:
+            return None
+        with self._quota_executors_lock:
+            if resource not in self._quota_executors:
+                self._quota_executors[resource] = ThreadPoolExecutor(
+                    max_workers=quota_workers,
+                    thread_name_prefix=f"{resource}-streams",
+                )
+            return self._quota_executors[resource]
+
+    def get_etag_cache(self) -> ETagCache | None:
+        """Return the cache of ETags shared by every stream of the tap.
+
+        Returns None unless `etag_cache_path` is set.
+        """
+        etag_cache_path = self.config.get("etag_cache_path")
+        if not etag_cache_path:
+            return None
+        with self._etag_cache_lock:
+            if self._etag_cache is None:
+                self._etag_cache = ETagCache(
+                    etag_cache_path,
+                    max_entries=self.config.get("etag_cache_max_entries"),
+                    logger=self.logger,
+                )
+                atexit.register(self._etag_cache.save)
+            return self._etag_cache
+
+    def get_partition_timings(self) -> PartitionTimingsCache | None:
+        """Return the cache of the time partitions took to sync on previous runs.
+
+        Returns None unless `partition_timings_path` is set.
+        """
+        partition_timings_path = self.config.get("partition_timings_path")
+        if not partition_timings_path:
+            return None
+        with self._partition_timings_lock:
+            if self._partition_timings is None:
+                self._partition_timings = PartitionTimingsCache(
+                    partition_timings_path, logger=self.logger
+                )
+                atexit.register(self._partition_timings.save)
+            return self._partition_timings
+
     def discover_streams(self) -> list[Stream]:
         """Return a list of discovered streams for each query."""
 
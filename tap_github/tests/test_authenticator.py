@@ -1,4 +1,5 @@
 import re
+import threading
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, call, patch
 
@@ -8,9 +9,13 @@ from singer_sdk.streams import RESTStream
 
 from tap_github.authenticator import (
     AppTokenManager,
+    AppTokenRefresher,
     GitHubTokenAuthenticator,
     PersonalTokenManager,
     TokenManager,
+    TokenPool,
+    TokenScheduler,
+    get_rate_limit_resource,
 )
 
 
@@ -56,7 +61,7 @@ class TestTokenManager:
         assert token_manager.rate_limit_used == 1
 
     def test_is_valid_token_successful(self):
-        with patch("requests.get") as mock_get:
+        with patch("requests.Session.get") as mock_get:
             mock_response = mock_get.return_value
             mock_response.raise_for_status.return_value = None
 
@@ -69,7 +74,7 @@ class TestTokenManager:
             )
 
     def test_is_valid_token_failure(self):
-        with patch("requests.get") as mock_get:
+        with patch("requests.Session.get") as mock_get:
             # Setup for a failed request
             mock_response = mock_get.return_value
             mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError()
@@ -326,6 +331,147 @@ class TestAppTokenManager:
 
         assert not token_manager.has_calls_remaining()
 
+    def test_has_calls_remaining_does_not_refresh_a_token_close_to_expiry(self):
+        close_to_expiry = _now() + timedelta(minutes=5)
+        with (
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                return_value=("valid_token", close_to_expiry),
+            ) as mock_generate,
+        ):
+            token_manager = AppTokenManager("12345;;key\\ncontent;;67890")
+            assert token_manager.refresh_at == close_to_expiry - timedelta(minutes=10)
+
+            assert token_manager.has_calls_remaining()
+            mock_generate.assert_called_once()
+
+
+class TestAppTokenRefresher:
+    def test_refreshes_tokens_due_for_refresh(self):
+        with (
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                side_effect=[
+                    ("old_token", _now() + timedelta(minutes=5)),
+                    ("fresh_token", _now() + timedelta(days=1)),
+                    ("new_token", _now() + timedelta(minutes=60)),
+                ],
+            ),
+        ):
+            due_token_manager = AppTokenManager("12345;;key\\ncontent;;67890")
+            fresh_token_manager = AppTokenManager("12345;;key\\ncontent;;67890")
+            refresher = AppTokenRefresher([due_token_manager, fresh_token_manager])
+
+            timeout = refresher.refresh_due_tokens()
+
+        assert due_token_manager.token == "new_token"
+        assert fresh_token_manager.token == "fresh_token"
+        # the new token is due for refresh in 50 minutes
+        assert timeout == AppTokenRefresher.MAX_SLEEP
+
+    def test_failed_refresh_keeps_the_current_token(self):
+        expires_at = _now() + timedelta(minutes=5)
+        with (
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                return_value=("old_token", expires_at),
+            ) as mock_generate,
+        ):
+            token_manager = AppTokenManager("12345;;key\\ncontent;;67890")
+            token_manager.logger = MagicMock()
+            mock_generate.side_effect = requests.exceptions.ConnectionError("boom")
+
+            assert not token_manager.refresh_token()
+
+        assert token_manager.token == "old_token"
+        assert token_manager.token_expires_at == expires_at
+        assert token_manager.refresh_at is not None
+        assert token_manager.refresh_at > _now()
+        token_manager.logger.warning.assert_called_once_with(
+            "GitHub app token refresh failed: boom"
+        )
+
+    def test_concurrent_refreshes_mint_a_single_token(self):
+        minting = threading.Event()
+        release = threading.Event()
+
+        def generate(*args):
+            minting.set()
+            release.wait(5)
+            return "new_token", _now() + timedelta(hours=1)
+
+        with (
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                return_value=("old_token", _now() - timedelta(minutes=1)),
+            ) as mock_generate,
+        ):
+            token_manager = AppTokenManager("12345;;key\\ncontent;;67890")
+            mock_generate.side_effect = generate
+            refresher = AppTokenRefresher([token_manager])
+
+            background = threading.Thread(target=refresher.refresh_due_tokens)
+            background.start()
+            assert minting.wait(5)
+            request = threading.Thread(target=token_manager.has_calls_remaining)
+            request.start()
+            release.set()
+            background.join()
+            request.join()
+
+        assert mock_generate.call_count == 2
+        assert token_manager.token == "new_token"
+
+    def test_token_pool_lock_is_not_held_while_minting(self):
+        lock_acquired = []
+
+        def generate(*args):
+            def acquire():
+                if token_pool.lock.acquire(timeout=5):
+                    token_pool.lock.release()
+                    lock_acquired.append(True)
+
+            thread = threading.Thread(target=acquire)
+            thread.start()
+            thread.join()
+            return "new_token", _now() + timedelta(hours=1)
+
+        with (
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch.object(AppTokenRefresher, "start"),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                return_value=("old_token", _now() - timedelta(minutes=1)),
+            ) as mock_generate,
+        ):
+            token_pool = TokenPool([AppTokenManager("12345;;key\\ncontent;;67890")])
+            mock_generate.side_effect = generate
+
+            active_token = token_pool.get_active_token()
+
+        assert active_token is not None
+        assert active_token.token == "new_token"
+        assert lock_acquired == [True]
+
+    def test_token_pool_starts_a_refresher_for_app_tokens(self):
+        with (
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                return_value=("valid_token", _now() + timedelta(days=1)),
+            ),
+        ):
+            app_token_manager = AppTokenManager("12345;;key\\ncontent;;67890")
+
+        assert TokenPool([TokenManager("mytoken")]).token_refresher is None
+        token_pool = TokenPool([app_token_manager])
+        assert token_pool.token_refresher is not None
+        token_pool.token_refresher.stop()
+
 
 @pytest.fixture
 def mock_stream():
@@ -667,3 +813,256 @@ class TestGitHubTokenAuthenticator:
             token_managers = auth.prepare_tokens()
 
             assert len(token_managers) == 0
+
+
+class TestTokenPool:
+    def test_streams_of_a_tap_share_one_token_pool(self):
+        from tap_github.tap import TapGitHub
+
+        with (
+            patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+            patch.object(
+                PersonalTokenManager, "is_valid_token", return_value=True
+            ) as mock_is_valid,
+        ):
+            tap = TapGitHub(
+                config={
+                    "repositories": ["MeltanoLabs/tap-github"],
+                    "additional_auth_tokens": ["gt1", "gt2"],
+                }
+            )
+            issues_auth = tap.streams["issues"].authenticator
+            commits_auth = tap.streams["commits"].authenticator
+
+            assert issues_auth is not commits_auth
+            assert issues_auth.token_pool is commits_auth.token_pool
+            # each token was validated only once for the whole tap
+            assert mock_is_valid.call_count == 2
+
+    def test_discovery_does_not_validate_tokens(self):
+        from tap_github.tap import TapGitHub
+
+        with (
+            patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+            patch.object(PersonalTokenManager, "is_valid_token") as mock_is_valid,
+        ):
+            tap = TapGitHub(
+                config={
+                    "repositories": ["MeltanoLabs/tap-github"],
+                    "additional_auth_tokens": ["gt1", "gt2"],
+                }
+            )
+            tap.run_discovery()
+
+        mock_is_valid.assert_not_called()
+
+    def test_rate_limit_updates_are_seen_by_all_streams(self, mock_stream):
+        mock_response_headers = {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "4000",
+            "X-RateLimit-Reset": "1372700873",
+            "X-RateLimit-Used": "1000",
+        }
+        token_pool = TokenPool([TokenManager("gt1"), TokenManager("gt2")])
+        tap = MagicMock()
+        tap.get_token_pool.return_value = token_pool
+        mock_stream._tap = tap
+
+        auth_1 = GitHubTokenAuthenticator(stream=mock_stream)
+        auth_2 = GitHubTokenAuthenticator(stream=mock_stream)
+        auth_1.update_rate_limit(mock_response_headers)
+
+        assert auth_2.active_token is auth_1.active_token
+        assert auth_2.active_token.rate_limit_remaining == 4000
+
+
+def _rate_limit_headers(used: int, reset: datetime) -> dict[str, str]:
+    return {
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": str(5000 - used),
+        "X-RateLimit-Reset": str(int(reset.timestamp())),
+        "X-RateLimit-Used": str(used),
+    }
+
+
+class TestTokenScheduler:
+    def test_lease_returns_token_with_most_headroom(self):
+        token_managers = [TokenManager(f"gt{i}") for i in range(3)]
+        reset = _now() + timedelta(hours=1)
+        for token_manager, used in zip(token_managers, [3000, 100, 2000]):
+            token_manager.update_rate_limit(_rate_limit_headers(used, reset))
+
+        scheduler = TokenScheduler(token_managers)
+        assert scheduler.lease() is token_managers[1]
+
+        # draining the leased token reschedules it behind the others
+        token_managers[1].update_rate_limit(_rate_limit_headers(3500, reset))
+        scheduler.push(token_managers[1])
+        assert scheduler.lease() is token_managers[2]
+
+    def test_lease_returns_none_and_next_reset_if_all_exhausted(self):
+        token_managers = [TokenManager(f"gt{i}") for i in range(3)]
+        for token_manager, hours in zip(token_managers, [3, 1, 2]):
+            token_manager.update_rate_limit(
+                _rate_limit_headers(4999, _now() + timedelta(hours=hours))
+            )
+
+        scheduler = TokenScheduler(token_managers)
+        assert scheduler.lease() is None
+        assert scheduler.next_reset() is token_managers[1]
+
+    def test_exhausted_token_is_leased_again_after_reset(self):
+        token_manager = TokenManager("gt1")
+        token_manager.update_rate_limit(
+            _rate_limit_headers(4999, _now() + timedelta(hours=1))
+        )
+        scheduler = TokenScheduler([token_manager])
+        assert scheduler.lease() is None
+
+        token_manager.get_rate_limit().reset = _now() - timedelta(seconds=1)
+        assert scheduler.lease() is token_manager
+
+
+class TestTokenPoolRotation:
+    def test_get_next_auth_token_reports_next_reset_when_exhausted(self):
+        token_managers = [TokenManager("gt1"), TokenManager("gt2")]
+        token_pool = TokenPool(token_managers, logger=MagicMock())
+        first_reset = _now() + timedelta(minutes=5)
+
+        token_pool.update_rate_limit(_rate_limit_headers(4999, first_reset))
+        assert token_pool.get_next_auth_token() is None
+        token_pool.update_rate_limit(
+            _rate_limit_headers(4999, _now() + timedelta(minutes=30))
+        )
+
+        assert token_pool.get_next_auth_token() == first_reset.replace(microsecond=0)
+        assert token_pool.active_token is not None
+        assert token_pool.active_token.rate_limit_reset == first_reset.replace(
+            microsecond=0
+        )
+
+
+class TestRateLimitResources:
+    def test_update_rate_limit_tracks_resources_separately(self):
+        token_manager = TokenManager("mytoken")
+        reset = _now() + timedelta(hours=1)
+        token_manager.update_rate_limit(
+            {**_rate_limit_headers(4900, reset), "X-RateLimit-Resource": "graphql"}
+        )
+        token_manager.update_rate_limit(
+            {
+                "X-RateLimit-Limit": "30",
+                "X-RateLimit-Remaining": "28",
+                "X-RateLimit-Reset": str(int(reset.timestamp())),
+                "X-RateLimit-Used": "2",
+                "X-RateLimit-Resource": "search",
+            }
+        )
+
+        assert token_manager.rate_limit_used == 0
+        assert not token_manager.has_calls_remaining("graphql")
+        assert token_manager.has_calls_remaining()
+        assert token_manager.get_rate_limit("search").remaining == 28
+        # the buffer is scaled down to the size of the search quota
+        assert token_manager.get_rate_limit("search").buffer == 6
+
+    def test_draining_graphql_does_not_rotate_core_token(self):
+        token_pool = TokenPool([TokenManager("gt1"), TokenManager("gt2")])
+        core_token = token_pool.get_active_token("core")
+        graphql_token = token_pool.get_active_token("graphql")
+        assert graphql_token is not None
+        token_pool.update_rate_limit(
+            {
+                **_rate_limit_headers(4999, _now() + timedelta(hours=1)),
+                "X-RateLimit-Resource": "graphql",
+            },
+            token=graphql_token.token,
+        )
+
+        assert token_pool.get_active_token("core") is core_token
+        assert token_pool.get_active_token("graphql") is not graphql_token
+
+    @pytest.mark.parametrize(
+        "url,resource",
+        [
+            ("https://api.github.com/repos/org/repo/issues", "core"),
+            ("https://api.github.com/graphql", "graphql"),
+            ("https://api.github.com/search/repositories?q=tap", "search"),
+            ("https://api.github.com/search/code?q=tap", "code_search"),
+            ("https://ghe.example.com/api/v3/search/issues", "search"),
+        ],
+    )
+    def test_get_rate_limit_resource(self, url, resource):
+        assert get_rate_limit_resource(url) == resource
+
+
+def _app_token_manager(installation_id: str, owner: str) -> AppTokenManager:
+    with (
+        patch.object(AppTokenManager, "is_valid_token", return_value=True),
+        patch(
+            "tap_github.authenticator.generate_app_access_token",
+            return_value=(f"token{installation_id}", _now() + timedelta(hours=1)),
+        ),
+    ):
+        return AppTokenManager(
+            "123;;key",
+            installation_id=installation_id,
+            installation_owner=owner,
+        )
+
+
+class TestAppInstallations:
+    def test_prepare_tokens_mints_one_token_per_installation(self, mock_stream):
+        def generate_token_mock(app_id, private_key, installation_id):
+            return (f"tokenfor{installation_id}", _now() + timedelta(hours=1))
+
+        with (
+            patch.object(
+                GitHubTokenAuthenticator,
+                "get_env",
+                return_value={"GITHUB_APP_PRIVATE_KEY": "123;;key"},
+            ),
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch(
+                "tap_github.authenticator.list_app_installations",
+                return_value=[
+                    {"id": 1, "account": {"login": "MeltanoLabs"}},
+                    {"id": 2, "account": {"login": "octocat"}},
+                ],
+            ),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                side_effect=generate_token_mock,
+            ),
+        ):
+            auth = GitHubTokenAuthenticator(stream=mock_stream)
+            token_managers = auth.prepare_tokens()
+            auth.token_pool.token_refresher.stop()
+
+        assert {
+            (tm.token, tm.github_installation_id, tm.installation_owner)
+            for tm in token_managers
+        } == {("tokenfor1", "1", "meltanolabs"), ("tokenfor2", "2", "octocat")}
+
+    def test_requests_are_routed_to_the_owner_installation(self):
+        personal_token = TokenManager("personaltoken")
+        meltano_token = _app_token_manager("1", "MeltanoLabs")
+        octocat_token = _app_token_manager("2", "octocat")
+        token_pool = TokenPool([personal_token, meltano_token, octocat_token])
+        token_pool.token_refresher.stop()
+
+        assert set(token_pool.get_token_managers("meltanolabs")) == {
+            personal_token,
+            meltano_token,
+        }
+        # owners without an installation can use any token
+        assert token_pool.get_token_managers("other") == token_pool.token_managers
+
+        # drain the personal token, only the installation token is left
+        token_pool.update_rate_limit(
+            _rate_limit_headers(4999, _now() + timedelta(hours=1)),
+            token=personal_token.token,
+        )
+        for _ in range(3):
+            assert token_pool.get_active_token("core", "MeltanoLabs") is meltano_token
+            assert token_pool.get_active_token("core", "octocat") is octocat_token
@@ -0,0 +1,761 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import PropertyMock, patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+
+from tap_github.authenticator import GitHubTokenAuthenticator, PersonalTokenManager
+from tap_github.partition_timings import PartitionTimingsCache
+from tap_github.repository_streams import (
+    IssuesStream,
+    PullRequestCommits,
+    PullRequestsStream,
+    RepositoryStream,
+    ReviewsStream,
+    WorkflowRunJobsStream,
+)
+
+PARTITIONS = [
+    {"org": "MeltanoLabs", "repo": f"repo{i}", "repo_id": i} for i in range(4)
+]
+
+
+@pytest.fixture
+def tap():
+    from tap_github.tap import TapGitHub
+
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+    ):
+        yield TapGitHub(
+            config={
+                "repositories": [f"MeltanoLabs/repo{i}" for i in range(4)],
+                "auth_token": "gt1",
+                "partition_workers": 4,
+                "child_stream_workers": 6,
+                "page_workers": 4,
+                "read_ahead_pages": 2,
+                "graphql_batch_size": 3,
+            }
+        )
+
+
+def test_partitions_are_synced_concurrently(tap, capsys, tmp_path):
+    # every partition has to be in flight at the same time to get past the barrier
+    barrier = threading.Barrier(len(PARTITIONS), timeout=10)
+
+    def repository_records(self, context):
+        barrier.wait()
+        yield {
+            "id": context["repo_id"],
+            "name": context["repo"],
+            "owner": {"login": context["org"]},
+            "updated_at": "2024-01-01T00:00:00Z",
+        }
+
+    def issue_records(self, context):
+        for number in range(3):
+            yield {
+                "id": context["repo_id"] * 10 + number,
+                "number": number,
+                "title": "title",
+                "body": "body",
+                "updated_at": f"2024-01-0{number + 1}T00:00:00Z",
+            }
+
+    repositories = tap.streams["repositories"]
+    repositories.child_streams = [tap.streams["issues"]]
+    partition_timings = PartitionTimingsCache(tmp_path / "timings.json")
+    with (
+        patch.object(
+            RepositoryStream, "partitions", new_callable=PropertyMock
+        ) as partitions,
+        patch.object(RepositoryStream, "request_records", repository_records),
+        patch.object(IssuesStream, "request_records", issue_records),
+        patch.object(
+            type(tap), "get_partition_timings", return_value=partition_timings
+        ),
+    ):
+        partitions.return_value = PARTITIONS
+        repositories.sync()
+        repositories.finalize_state_progress_markers()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [message for message in messages if message["type"] == "RECORD"]
+    assert len([r for r in records if r["stream"] == "repositories"]) == 4
+    assert len([r for r in records if r["stream"] == "issues"]) == 12
+
+    # the schema of a stream is written before its records
+    for record in records:
+        assert any(
+            message["type"] == "SCHEMA" and message["stream"] == record["stream"]
+            for message in messages[: messages.index(record)]
+        )
+
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+    issues_bookmarks = state["bookmarks"]["issues"]["partitions"]
+    assert len(issues_bookmarks) == 4
+    assert {p["replication_key_value"] for p in issues_bookmarks} == {
+        "2024-01-03T00:00:00Z"
+    }
+    repositories_bookmarks = state["bookmarks"]["repositories"]["partitions"]
+    assert len(repositories_bookmarks) == 4
+    # partitions are timed to sort them on the next run, apart from the state
+    assert not any("sync_seconds" in p for p in repositories_bookmarks)
+    partition_timings.save()
+    timings = PartitionTimingsCache(tmp_path / "timings.json")
+    assert all(
+        timings.get_seconds("repositories", partition) is not None
+        for partition in PARTITIONS
+    )
+
+
+def test_costliest_partitions_come_first(tap, tmp_path):
+    repositories = tap.streams["repositories"]
+    partition_timings = PartitionTimingsCache(tmp_path / "timings.json")
+    partition_timings.set_seconds("repositories", PARTITIONS[0], 10.0)
+    partition_timings.set_seconds("repositories", PARTITIONS[1], 500.0)
+    repositories._repository_sizes = {
+        2: (1000, 10, 5, "2024-01-01T00:00:00Z"),
+        3: (900000, 10, 5, "2024-01-01T00:00:00Z"),
+    }
+
+    with patch.object(
+        type(tap), "get_partition_timings", return_value=partition_timings
+    ):
+        assert [
+            p["repo_id"]
+            for p in sorted(
+                PARTITIONS, key=repositories.get_partition_cost, reverse=True
+            )
+        ] == [3, 2, 1, 0]
+
+
+def test_failing_partition_fails_the_sync(tap):
+    def repository_records(self, context):
+        if context["repo_id"] == 2:
+            raise RuntimeError("boom")
+        return iter([])
+
+    repositories = tap.streams["repositories"]
+    with (
+        patch.object(
+            RepositoryStream, "partitions", new_callable=PropertyMock
+        ) as partitions,
+        patch.object(RepositoryStream, "request_records", repository_records),
+        pytest.raises(RuntimeError, match="boom"),
+    ):
+        partitions.return_value = PARTITIONS
+        repositories.sync()
+
+
+def test_schema_is_written_once_by_concurrent_syncs(tap, capsys):
+    stream = tap.streams["workflow_run_jobs"]
+    generate_schema_messages = WorkflowRunJobsStream._generate_schema_messages
+
+    def slow_schema_messages(self):
+        # give other threads the time to check whether the schema was written
+        time.sleep(0.05)
+        return generate_schema_messages(self)
+
+    with patch.object(
+        WorkflowRunJobsStream, "_generate_schema_messages", slow_schema_messages
+    ):
+        threads = [
+            threading.Thread(target=stream._write_schema_message) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [m["stream"] for m in messages if m["type"] == "SCHEMA"] == [
+        "workflow_run_jobs"
+    ]
+
+
+def test_child_streams_are_fetched_ahead_in_order(tap, capsys):
+    # the commits and reviews of all 3 pull requests have to be in flight at once
+    barrier = threading.Barrier(6, timeout=10)
+
+    def pull_request_records(self, context):
+        for number in range(3):
+            yield {
+                "id": number,
+                "number": number,
+                "title": "title",
+                "body": "body",
+                "updated_at": "2024-01-01T00:00:00Z",
+            }
+
+    def child_records(self, context):
+        barrier.wait()
+        yield {"node_id": f"{self.name}-{context['pull_number']}", "id": 1}
+
+    pull_requests = tap.streams["pull_requests"]
+    pull_requests.child_streams = [
+        tap.streams["pull_request_commits"],
+        tap.streams["reviews"],
+    ]
+    with (
+        patch.object(PullRequestsStream, "request_records", pull_request_records),
+        patch.object(PullRequestCommits, "request_records", child_records),
+        patch.object(ReviewsStream, "request_records", child_records),
+    ):
+        pull_requests.sync(context={"org": "MeltanoLabs", "repo": "a", "repo_id": 1})
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [
+        message["record"].get("node_id") or message["record"]["number"]
+        for message in messages
+        if message["type"] == "RECORD"
+    ]
+    # same order as if the child streams were synced one after the other
+    assert records == [
+        record
+        for number in range(3)
+        for record in (f"pull_request_commits-{number}", f"reviews-{number}", number)
+    ]
+    assert not tap.streams["reviews"]._prefetched_records
+
+
+def test_prefetched_records_start_from_the_bookmark(tap):
+    requested_urls = []
+
+    def send(session, request, **kwargs):
+        requested_urls.append(request.url)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"[]"
+        response.url = request.url
+        response.request = request
+        return response
+
+    issues = tap.streams["issues"]
+    issues.get_context_state(PARTITIONS[0]).update(
+        replication_key="updated_at",
+        replication_key_value="2024-01-01T00:00:00+00:00",
+    )
+    with (
+        patch.object(requests.Session, "send", send),
+        ThreadPoolExecutor(max_workers=1) as executor,
+    ):
+        key = issues.prefetch(executor, PARTITIONS[0])
+        assert issues._pop_prefetched_records(key=key).result() == []
+
+    assert parse_qs(urlparse(requested_urls[0]).query)["since"] == [
+        "2024-01-01T00:00:00+00:00"
+    ]
+
+
+def test_pages_are_fetched_ahead_in_order(tap):
+    # pages 2 to 5 have to be in flight at the same time to get past the barrier
+    barrier = threading.Barrier(4, timeout=10)
+    url = "https://api.github.com/repos/MeltanoLabs/a/contributors"
+
+    def send(session, request, **kwargs):
+        page = int(parse_qs(urlparse(request.url).query).get("page", ["1"])[0])
+        if page > 1:
+            barrier.wait()
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            [{"id": page * 10 + i, "login": f"user{page}"} for i in range(2)]
+        ).encode()
+        response.headers = CaseInsensitiveDict(
+            {"Link": f'<{url}?page=5>; rel="last"'} if page == 1 else {}
+        )
+        response.url = request.url
+        response.request = request
+        return response
+
+    with patch.object(requests.Session, "send", send):
+        records = list(
+            tap.streams["contributors"].request_records(
+                {"org": "MeltanoLabs", "repo": "a", "repo_id": 1}
+            )
+        )
+
+    assert [record["id"] for record in records] == [
+        page * 10 + i for page in range(1, 6) for i in range(2)
+    ]
+
+
+def _issues_page(request, page, last_page):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(
+        [
+            {"id": page * 10 + i, "number": i, "updated_at": "2024-01-01T00:00:00Z"}
+            for i in range(2)
+        ]
+    ).encode()
+    response.headers = CaseInsensitiveDict(
+        {"Link": f'<{request.url.split("?")[0]}?page={page + 1}>; rel="next"'}
+        if page < last_page
+        else {}
+    )
+    response.url = request.url
+    response.request = request
+    return response
+
+
+def test_next_pages_are_read_ahead(tap):
+    requested_pages = []
+    page_3_requested = threading.Event()
+
+    def send(session, request, **kwargs):
+        page = int(parse_qs(urlparse(request.url).query).get("page", ["1"])[0])
+        requested_pages.append(page)
+        if page == 3:
+            page_3_requested.set()
+        return _issues_page(request, page, last_page=5)
+
+    with patch.object(requests.Session, "send", send):
+        records = iter(
+            tap.streams["issues"].request_records({"org": "MeltanoLabs", "repo": "a"})
+        )
+        assert next(records)["id"] == 10
+        # pages 2 and 3 are requested before the records of page 1 are processed
+        assert page_3_requested.wait(timeout=10)
+        assert [record["id"] for record in records] == [
+            page * 10 + i for page in range(1, 6) for i in range(2)
+        ][1:]
+    assert requested_pages == [1, 2, 3, 4, 5]
+
+
+def test_read_ahead_errors_are_raised(tap):
+    def send(session, request, **kwargs):
+        if "page=2" in request.url:
+            raise requests.exceptions.InvalidURL("boom")
+        return _issues_page(request, 1, last_page=5)
+
+    records = []
+    with (
+        patch.object(requests.Session, "send", send),
+        pytest.raises(requests.exceptions.InvalidURL, match="boom"),
+    ):
+        records.extend(
+            tap.streams["issues"].request_records({"org": "MeltanoLabs", "repo": "a"})
+        )
+    assert [record["id"] for record in records] == [10, 11]
+
+
+def test_graphql_partitions_are_batched(tap, capsys):
+    queries = []
+
+    def repository_records(self, context):
+        for repo_id in range(4):
+            yield {
+                "id": repo_id,
+                "name": f"repo{repo_id}",
+                "owner": {"login": "MeltanoLabs"},
+                "updated_at": "2024-01-01T00:00:00Z",
+            }
+
+    def send(session, request, **kwargs):
+        body = json.loads(request.body)
+        queries.append(body)
+        data = {}
+        for name, value in body["variables"].items():
+            alias, variable = name.split("_", 1)
+            if variable != "repo":
+                continue
+            cursor = body["variables"][f"{alias}_nextPageCursor_0"]
+            data[alias] = {
+                "stargazers": {
+                    "pageInfo": {
+                        # the first repository has 2 pages of stargazers
+                        "hasNextPage_0": value == "repo0" and cursor is None,
+                        "startCursor_0": None,
+                        "endCursor_0": "cursor1",
+                    },
+                    "edges": [
+                        {
+                            "user": {"id": 1, "login": f"{value}-{cursor}"},
+                            "starred_at": "2024-01-01T00:00:00Z",
+                        }
+                    ],
+                }
+            }
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            {"data": {**data, "rateLimit": {"cost": 1}}}
+        ).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    repositories = tap.streams["repositories"]
+    repositories.child_streams = [tap.streams["stargazers"]]
+    with (
+        patch.object(RepositoryStream, "request_records", repository_records),
+        patch.object(requests.Session, "send", send),
+    ):
+        repositories.sync(context={"org": "MeltanoLabs", "repo": "a", "repo_id": 1})
+
+    # 3 repositories, then the last one and the second page of the first one
+    assert [sorted(query["variables"]) for query in queries] == [
+        [
+            f"p{i}_{name}"
+            for i in range(3)
+            for name in ("nextPageCursor_0", "org", "repo")
+        ],
+        ["p0_nextPageCursor_0", "p0_org", "p0_repo"],
+        ["p0_nextPageCursor_0", "p0_org", "p0_repo"],
+    ]
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [
+        message["record"].get("user", {}).get("login") or message["record"]["name"]
+        for message in messages
+        if message["type"] == "RECORD"
+    ]
+    assert records == [
+        "repo0-None",
+        "repo0-cursor1",
+        "repo0",
+        "repo1-None",
+        "repo1",
+        "repo2-None",
+        "repo2",
+        "repo3-None",
+        "repo3",
+    ]
+
+
+def test_batch_query(tap):
+    query = tap.streams["dependencies"].get_batch_query(["p0", "p1"])
+
+    assert query.startswith("query repositoryDependenciesBatch($p0_repo: String!")
+    assert "$p1_nextPageCursor_1: String" in query
+    assert "p1: repository(name: $p1_repo owner: $p1_org)" in query
+    assert "after: $p1_nextPageCursor_1" in query
+    assert query.count("rateLimit") == 1
+
+
+def _stargazers_response(request, failing_repos=(), status_code=200):
+    """Answer a batched stargazers query, with errors for the failing repos."""
+    body = json.loads(request.body)
+    data, errors = {}, []
+    for name, value in body["variables"].items():
+        alias, variable = name.split("_", 1)
+        if variable != "repo":
+            continue
+        if value in failing_repos:
+            data[alias] = None
+            errors.append({"type": "SERVICE_UNAVAILABLE", "path": [alias]})
+            continue
+        data[alias] = {
+            "stargazers": {
+                "pageInfo": {"hasNextPage_0": False, "endCursor_0": None},
+                "edges": [
+                    {
+                        "user": {"id": 1, "login": value},
+                        "starred_at": "2024-01-01T00:00:00Z",
+                    }
+                ],
+            }
+        }
+    response = requests.Response()
+    response.status_code = status_code
+    payload = {"data": {**data, "rateLimit": {"cost": 1}}}
+    if errors:
+        payload["errors"] = errors
+    response._content = json.dumps(payload).encode()
+    response.url = request.url
+    response.request = request
+    return response
+
+
+def _prefetch_stargazers(stream, repos):
+    contexts = [
+        {"org": "MeltanoLabs", "repo": repo, "repo_id": i}
+        for i, repo in enumerate(repos)
+    ]
+    keys = stream.prefetch_batch(None, contexts)
+    return [stream._pop_prefetched_records(key=key) for key in keys]
+
+
+def test_failed_batch_is_split_in_two(tap):
+    stream = tap.streams["stargazers"]
+    batches = []
+
+    def send(session, request, **kwargs):
+        repos = [
+            value
+            for name, value in json.loads(request.body)["variables"].items()
+            if name.endswith("_repo")
+        ]
+        batches.append(repos)
+        if "repo2" in repos and len(repos) > 1:
+            return _stargazers_response(request, status_code=502)
+        return _stargazers_response(request)
+
+    with (
+        patch.object(stream, "backoff_max_tries", return_value=1),
+        patch.object(requests.Session, "send", send),
+    ):
+        futures = _prefetch_stargazers(stream, ["repo0", "repo1", "repo2"])
+
+    assert batches == [
+        ["repo0", "repo1", "repo2"],
+        ["repo0"],
+        ["repo1", "repo2"],
+        ["repo1"],
+        ["repo2"],
+    ]
+    assert [future.result()[0]["user"]["login"] for future in futures] == [
+        "repo0",
+        "repo1",
+        "repo2",
+    ]
+
+
+def test_batch_is_not_split_on_rate_limits(tap):
+    stream = tap.streams["stargazers"]
+    response = requests.Response()
+    response.status_code = 403
+    error = RetriableAPIError("secondary rate limit", response)
+
+    with patch.object(stream, "request_batch_records", side_effect=error) as request:
+        futures = _prefetch_stargazers(stream, ["repo0", "repo1", "repo2"])
+
+    # splitting the batch would only send more requests
+    assert request.call_count == 1
+    assert all(future.exception() is error for future in futures)
+
+
+def test_retries_are_sent_with_smaller_pages(tap):
+    stream = tap.streams["stargazers"]
+    queries = []
+
+    def send(session, request, **kwargs):
+        queries.append(json.loads(request.body)["query"])
+        status_code = 502 if len(queries) == 1 else 200
+        return _stargazers_response(request, status_code=status_code)
+
+    def no_wait():
+        while True:
+            yield 0
+
+    with (
+        patch.object(stream, "backoff_max_tries", return_value=2),
+        patch.object(stream, "backoff_wait_generator", no_wait),
+        patch.object(requests.Session, "send", send),
+    ):
+        futures = _prefetch_stargazers(stream, ["repo0"])
+
+    assert futures[0].result()[0]["user"]["login"] == "repo0"
+    assert "first: 100" in queries[0]
+    assert "first: 50" in queries[1]
+
+
+def test_only_failed_aliases_are_retried(tap):
+    stream = tap.streams["stargazers"]
+    batches = []
+
+    def send(session, request, **kwargs):
+        variables = json.loads(request.body)["variables"]
+        batches.append(sorted(variables))
+        # repo1 fails in the batch only
+        return _stargazers_response(
+            request, failing_repos={"repo1"} if len(variables) > 3 else ()
+        )
+
+    with patch.object(requests.Session, "send", send):
+        futures = _prefetch_stargazers(stream, ["repo0", "repo1", "repo2"])
+
+    assert len(batches) == 2
+    assert batches[1] == ["p0_nextPageCursor_0", "p0_org", "p0_repo"]
+    assert [future.result()[0]["user"]["login"] for future in futures] == [
+        "repo0",
+        "repo1",
+        "repo2",
+    ]
+
+
+def test_failing_partition_raises(tap):
+    stream = tap.streams["stargazers"]
+
+    def send(session, request, **kwargs):
+        return _stargazers_response(request, failing_repos={"repo1"})
+
+    with patch.object(requests.Session, "send", send):
+        futures = _prefetch_stargazers(stream, ["repo0", "repo1"])
+
+    with pytest.raises(FatalAPIError, match="SERVICE_UNAVAILABLE"):
+        futures[1].result()
+
+
+def test_batched_partitions_start_from_their_bookmark(tap):
+    stream = tap.streams["stargazers"]
+    contexts = [
+        {"org": "MeltanoLabs", "repo": f"repo{i}", "repo_id": i} for i in range(2)
+    ]
+    stream.get_context_state(contexts[0]).update(
+        replication_key="starred_at",
+        replication_key_value="2024-06-01T00:00:00Z",
+    )
+    batches = []
+
+    def send(session, request, **kwargs):
+        variables = json.loads(request.body)["variables"]
+        batches.append(sorted(variables))
+        if len(batches) == 2:
+            # repo0 was resolved as soon as its pagination ended
+            key = stream._get_prefetch_key(contexts[0])
+            assert stream._prefetched_records[key].done()
+        data = {
+            alias: {
+                "stargazers": {
+                    "pageInfo": {
+                        "hasNextPage_0": cursor is None,
+                        "endCursor_0": "cursor1",
+                    },
+                    "edges": [
+                        {
+                            "user": {"id": 1, "login": "user"},
+                            "starred_at": "2024-01-01T00:00:00Z",
+                        }
+                    ],
+                }
+            }
+            for alias in ("p0", "p1")
+            if f"{alias}_repo" in variables
+            for cursor in [variables[f"{alias}_nextPageCursor_0"]]
+        }
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"data": data}).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    with patch.object(requests.Session, "send", send):
+        keys = stream.prefetch_batch(None, contexts)
+
+    # the stars of repo0 are older than its bookmark, its pagination stops early
+    assert batches == [
+        [
+            "p0_nextPageCursor_0",
+            "p0_org",
+            "p0_repo",
+            "p1_nextPageCursor_0",
+            "p1_org",
+            "p1_repo",
+        ],
+        ["p1_nextPageCursor_0", "p1_org", "p1_repo"],
+    ]
+    assert [len(stream._pop_prefetched_records(key=key).result()) for key in keys] == [
+        1,
+        2,
+    ]
+
+
+def test_page_sizes_are_scaled(tap):
+    stream = tap.streams["dependencies"]
+    stream.page_size.shrink()
+
+    query = stream.prepare_request_payload({"org": "o", "repo": "r"}, None)["query"]
+
+    assert "dependencyGraphManifests (first: 1 " in query
+    assert "dependencies (first: 25 " in query
+
+
+def test_graphql_child_streams_are_fetched_while_rest_ones_sync(capsys):
+    from tap_github.tap import TapGitHub
+
+    stargazers_requested = threading.Event()
+    stargazers_variables = []
+
+    def repository_records(self, context):
+        yield {
+            "id": 1,
+            "name": "repo0",
+            "owner": {"login": "MeltanoLabs"},
+            "updated_at": "2024-01-01T00:00:00Z",
+        }
+
+    def issue_records(self, context):
+        # only returns once stargazers, synced after issues, were requested
+        assert stargazers_requested.wait(timeout=10)
+        yield {
+            "id": 1,
+            "number": 1,
+            "title": "title",
+            "body": "body",
+            "updated_at": "2024-01-01T00:00:00Z",
+        }
+
+    def send(session, request, **kwargs):
+        stargazers_variables.append(json.loads(request.body)["variables"])
+        stargazers_requested.set()
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            {
+                "data": {
+                    "repository": {
+                        "stargazers": {
+                            "pageInfo": {"hasNextPage_0": False, "endCursor_0": None},
+                            "edges": [
+                                {
+                                    "user": {"id": 1, "login": "octocat"},
+                                    "starred_at": "2024-01-01T00:00:00Z",
+                                }
+                            ],
+                        }
+                    },
+                    "rateLimit": {"cost": 1},
+                }
+            }
+        ).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+    ):
+        tap = TapGitHub(
+            config={
+                "repositories": ["MeltanoLabs/repo0"],
+                "auth_token": "gt1",
+                "quota_workers": 1,
+            }
+        )
+        repositories = tap.streams["repositories"]
+        repositories.child_streams = [tap.streams["issues"], tap.streams["stargazers"]]
+        assert [
+            child_stream.rate_limit_resource
+            for child_stream in repositories.child_streams
+        ] == ["core", "graphql"]
+        tap.streams["stargazers"].get_context_state({"repo_id": 1}).update(
+            replication_key="starred_at",
+            replication_key_value="2023-06-01T00:00:00Z",
+        )
+        with (
+            patch.object(RepositoryStream, "request_records", repository_records),
+            patch.object(IssuesStream, "request_records", issue_records),
+            patch.object(requests.Session, "send", send),
+        ):
+            repositories.sync(context={"org": "MeltanoLabs", "repo": "repo0"})
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [m["stream"] for m in messages if m["type"] == "RECORD"] == [
+        "issues",
+        "stargazers",
+        "repositories",
+    ]
+    # stargazers were fetched ahead from their bookmark
+    assert stargazers_variables[0]["since"] == "2023-06-01T00:00:00+00:00"
@@ -0,0 +1,33 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from tap_github.decoding import decode_json
+
+
+def _response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    return response
+
+
+def test_response_is_decoded_once():
+    response = _response(json.dumps([{"id": 1}]).encode())
+    loads = MagicMock(side_effect=json.loads)
+    with patch("tap_github.decoding._get_loads", return_value=loads):
+        assert decode_json(response) == [{"id": 1}]
+        assert decode_json(response) is decode_json(response)
+    loads.assert_called_once()
+
+
+def test_other_encodings_fall_back_to_requests():
+    response = _response(json.dumps({"name": "café"}).encode("utf-16"))
+    assert decode_json(response) == {"name": "café"}
+
+
+def test_invalid_body_raises_like_requests():
+    with pytest.raises(requests.JSONDecodeError):
+        decode_json(_response(b""))
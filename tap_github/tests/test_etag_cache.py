@@ -0,0 +1,225 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from tap_github.authenticator import GitHubTokenAuthenticator, PersonalTokenManager
+from tap_github.etag_cache import ETagCache, normalize_url
+
+ISSUES_URL = "https://api.github.com/repos/MeltanoLabs/tap-github/issues"
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "etags.json"
+
+
+@pytest.fixture
+def tap(cache_path):
+    from tap_github.tap import TapGitHub
+
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+    ):
+        yield TapGitHub(
+            config={
+                "repositories": ["MeltanoLabs/tap-github"],
+                "auth_token": "gt1",
+                "conditional_requests": True,
+                "etag_cache_path": str(cache_path),
+            }
+        )
+
+
+def _response(request, status_code=200, body=None, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode() if body is not None else b""
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.url = request.url
+    response.request = request
+    return response
+
+
+def _issue(number):
+    return {
+        "id": number,
+        "number": number,
+        "title": "title",
+        "body": "body",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://API.GitHub.com/repos/A/b?per_page=100&a=1#x") == (
+        "https://api.github.com/repos/A/b?a=1&per_page=100"
+    )
+
+
+class TestETagCache:
+    def test_save_merges_with_other_runs(self, cache_path):
+        cache = ETagCache(cache_path)
+        cache.set_etag(ISSUES_URL, '"a"')
+        cache.set_etag(ISSUES_URL + "?page=2", '"b"')
+        cache.save()
+
+        other_cache = ETagCache(cache_path)
+        other_cache.set_etag(ISSUES_URL + "?page=3", '"c"')
+        cache.discard(ISSUES_URL + "?page=2")
+        cache.save()
+        other_cache.save()
+
+        cache = ETagCache(cache_path)
+        assert cache.get_etag(ISSUES_URL) == '"a"'
+        assert cache.get_etag(ISSUES_URL + "?page=2") is None
+        assert cache.get_etag(ISSUES_URL + "?page=3") == '"c"'
+
+    def test_media_type_is_part_of_the_key(self, cache_path):
+        cache = ETagCache(cache_path)
+        cache.set_etag(ISSUES_URL, '"a"', accept="application/vnd.github.diff")
+        assert cache.get_etag(ISSUES_URL) is None
+
+    def test_least_recently_used_entries_are_evicted(self, cache_path):
+        cache = ETagCache(cache_path, max_entries=2)
+        for page, used_at in [(1, 3.0), (2, 1.0), (3, 2.0)]:
+            with patch("tap_github.etag_cache.time.time", return_value=used_at):
+                cache.set_etag(f"{ISSUES_URL}?page={page}", f'"{page}"')
+        cache.save()
+
+        assert set(json.loads(cache_path.read_text())) == {
+            cache.get_key(f"{ISSUES_URL}?page=1"),
+            cache.get_key(f"{ISSUES_URL}?page=3"),
+        }
+
+
+def test_not_modified_response_ends_pagination(tap):
+    stream = tap.streams["issues"]
+    etag_cache = tap.get_etag_cache()
+    sent_requests = []
+
+    def send(session, request, **kwargs):
+        sent_requests.append(request)
+        if "page=2" in request.url:
+            return _response(request, status_code=304)
+        return _response(
+            request,
+            body=[_issue(1)],
+            headers={"Link": f'<{ISSUES_URL}?page=2>; rel="next"', "ETag": '"1"'},
+        )
+
+    with (
+        patch.object(etag_cache, "get_etag", return_value='"2"'),
+        patch.object(stream, "parse_response", wraps=stream.parse_response) as parse,
+        patch.object(requests.Session, "send", send),
+    ):
+        records = list(stream.request_records({"org": "MeltanoLabs", "repo": "a"}))
+
+    assert [record["number"] for record in records] == [1]
+    assert len(sent_requests) == 2
+    assert parse.call_count == 1
+    assert all(r.headers["If-None-Match"] == '"2"' for r in sent_requests)
+
+
+def test_if_modified_since_is_sent_with_first_page_only(tap):
+    stream = tap.streams["issues"]
+    stream.get_context_state({"org": "MeltanoLabs", "repo": "a"}).update(
+        {"replication_key": "updated_at", "starting_replication_value": "2024-01-01"}
+    )
+    first_page = stream.prepare_request({"org": "MeltanoLabs", "repo": "a"}, None)
+    second_page = stream.prepare_request({"org": "MeltanoLabs", "repo": "a"}, 2)
+    other_partition = stream.prepare_request({"org": "MeltanoLabs", "repo": "b"}, None)
+
+    assert first_page.headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert "If-Modified-Since" not in second_page.headers
+    assert "If-Modified-Since" not in other_partition.headers
+
+
+def test_only_incremental_streams_without_children_are_conditional(tap):
+    etag_cache = tap.get_etag_cache()
+    context = {"org": "MeltanoLabs", "repo": "a", "repo_id": 1}
+    with patch.object(etag_cache, "get_etag", return_value='"1"'):
+        issues = tap.streams["issues"].prepare_request(context, None)
+        # repositories have child streams
+        repository = tap.streams["repositories"].prepare_request(context, None)
+        # languages are synced in full
+        languages = tap.streams["languages"].prepare_request(context, None)
+
+    assert issues.headers["If-None-Match"] == '"1"'
+    assert "If-None-Match" not in repository.headers
+    assert "If-None-Match" not in languages.headers
+
+
+def test_requests_are_not_conditional_by_default(cache_path):
+    from tap_github.tap import TapGitHub
+
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+    ):
+        tap = TapGitHub(
+            config={
+                "repositories": ["MeltanoLabs/tap-github"],
+                "auth_token": "gt1",
+                "etag_cache_path": str(cache_path),
+            }
+        )
+        stream = tap.streams["issues"]
+        context = {"org": "MeltanoLabs", "repo": "a"}
+        stream.get_context_state(context).update(
+            {
+                "replication_key": "updated_at",
+                "starting_replication_value": "2024-01-01",
+            }
+        )
+        with patch.object(tap.get_etag_cache(), "get_etag", return_value='"1"'):
+            request = stream.prepare_request(context, None)
+
+    assert "If-Modified-Since" not in request.headers
+    assert "If-None-Match" not in request.headers
+
+
+@pytest.mark.parametrize(
+    "body,headers,expected",
+    [
+        ([_issue(1)], {"ETag": '"1"'}, '"1"'),
+        (
+            [_issue(1)],
+            {"ETag": '"1"', "Link": f'<{ISSUES_URL}?page=2>; rel="next"'},
+            None,
+        ),
+        ([_issue(n) for n in range(100)], {"ETag": '"1"'}, None),
+        ([_issue(1)], {}, None),
+    ],
+)
+def test_etag_is_kept_for_last_page_only(tap, body, headers, expected):
+    stream = tap.streams["issues"]
+    request = requests.Request("GET", ISSUES_URL).prepare()
+    stream.update_etag_cache(request, _response(request, body=body, headers=headers))
+    stream.release_etags(None)
+    stream.save_etags()
+    assert tap.get_etag_cache().get_etag(ISSUES_URL) == expected
+
+
+def test_etag_is_kept_once_state_accounts_for_its_records(tap, capsys):
+    stream = tap.streams["issues"]
+    context = {"org": "MeltanoLabs", "repo": "a", "repo_id": 1}
+    etag_cache = tap.get_etag_cache()
+
+    def send(session, request, **kwargs):
+        return _response(request, body=[_issue(1)], headers={"ETag": '"1"'})
+
+    with patch.object(requests.Session, "send", send):
+        records = stream.get_records(context)
+        next(records)
+        # the record was not synced yet
+        assert etag_cache.entries == {}
+        assert list(records) == []
+        # nor was a STATE message accounting for it written
+        assert etag_cache.entries == {}
+        stream._write_state_message()
+
+    assert [entry["etag"] for entry in etag_cache.entries.values()] == ['"1"']
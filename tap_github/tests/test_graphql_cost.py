@@ -0,0 +1,223 @@
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+from singer_sdk.exceptions import FatalAPIError
+
+from tap_github.authenticator import GitHubTokenAuthenticator, PersonalTokenManager
+from tap_github.graphql_cost import count_connection_requests, estimate_query_cost
+
+
+@pytest.fixture
+def tap():
+    from tap_github.tap import TapGitHub
+
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+    ):
+        yield TapGitHub(
+            config={
+                "repositories": ["MeltanoLabs/tap-github"],
+                "auth_token": "gt1",
+                "graphql_batch_size": 3,
+            }
+        )
+
+
+def _exhaust_graphql_points(stream):
+    reset = datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    stream.authenticator.update_rate_limit(
+        CaseInsensitiveDict(
+            {
+                "X-RateLimit-Resource": "graphql",
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": "999",
+                "X-RateLimit-Reset": str(int(reset.timestamp())),
+                "X-RateLimit-Used": "4001",
+            }
+        ),
+        token="gt1",
+    )
+
+
+def test_cost_of_nested_connections():
+    # The example of GitHub's documentation: 1 + 100 + 100 * 50 requests
+    query = """
+      query {
+        viewer {
+          login
+          repositories(first: 100) {
+            edges {
+              node {
+                issues(first: 50, orderBy: {field: CREATED_AT}) @include(if: true) {
+                  edges { node { labels(last: $labels) { edges { node { name } } } } }
+                }
+              }
+            }
+          }
+        }
+        rateLimit { cost }
+      }
+    """
+    assert count_connection_requests(query) == 1 + 100 + 5000
+    assert estimate_query_cost(query) == 51
+    assert estimate_query_cost("query { viewer { login } }") == 1
+
+
+def test_rate_limit_is_read_from_the_query_without_headers(tap):
+    stream = tap.streams["stargazers"]
+    request = requests.Request(
+        "POST", stream.url_base, headers={"Authorization": "token gt1"}
+    ).prepare()
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(
+        {
+            "data": {
+                "rateLimit": {
+                    "cost": 1,
+                    "remaining": 4200,
+                    "resetAt": "2099-01-01T00:00:00Z",
+                }
+            }
+        }
+    ).encode()
+    response.request = request
+
+    stream.update_rate_limit(request, response)
+
+    token_manager = stream.authenticator.token_pool.get_token_manager("gt1")
+    rate_limit = token_manager.get_rate_limit("graphql")
+    assert (rate_limit.remaining, rate_limit.used) == (4200, 800)
+    assert rate_limit.reset == datetime(2099, 1, 1, tzinfo=timezone.utc)
+
+
+def test_query_is_not_sent_without_points_left(tap):
+    stream = tap.streams["stargazers"]
+    _exhaust_graphql_points(stream)
+    request = stream.prepare_request({"org": "MeltanoLabs", "repo": "tap-github"}, None)
+
+    with (
+        patch.object(requests.Session, "send") as send,
+        pytest.raises(FatalAPIError, match="estimated to cost 1 points"),
+    ):
+        stream._request(request, {"org": "MeltanoLabs"})
+    send.assert_not_called()
+
+
+def test_batch_size_fits_the_points_left(tap):
+    stream = tap.streams["stargazers"]
+    assert stream.get_batch_size() == 3
+    _exhaust_graphql_points(stream)
+    assert stream.get_batch_size() == 1
+
+
+def _spend_graphql_points(stream, token, used):
+    reset = datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    stream.authenticator.update_rate_limit(
+        CaseInsensitiveDict(
+            {
+                "X-RateLimit-Resource": "graphql",
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": str(5000 - used),
+                "X-RateLimit-Reset": str(int(reset.timestamp())),
+                "X-RateLimit-Used": str(used),
+            }
+        ),
+        token=token,
+    )
+
+
+@pytest.fixture
+def two_tokens_tap(request):
+    from tap_github.tap import TapGitHub
+
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+    ):
+        yield TapGitHub(
+            config={
+                "repositories": ["MeltanoLabs/tap-github"],
+                "auth_token": "gt1",
+                "additional_auth_tokens": ["gt2"],
+                **getattr(request, "param", {}),
+            }
+        )
+
+
+# 1 + 100 + 100 * 100 requests, i.e. 101 points.
+COSTLY_QUERY = """
+  query {
+    search(type: REPOSITORY, query: "tap", first: 100) {
+      nodes {
+        ... on Repository {
+          issues(first: 100) { nodes { comments(first: 100) { nodes { body } } } }
+        }
+      }
+    }
+  }
+"""
+
+
+def _costly_request(stream):
+    return requests.Request(
+        "POST", stream.url_base, json={"query": COSTLY_QUERY}
+    ).prepare()
+
+
+def test_query_is_sent_with_a_token_which_can_afford_it(two_tokens_tap):
+    stream = two_tokens_tap.streams["stargazers"]
+    token_pool = stream.authenticator.token_pool
+    # Both tokens have points left, gt1 fewer than the query costs.
+    _spend_graphql_points(stream, "gt1", 3950)
+    _spend_graphql_points(stream, "gt2", 3000)
+    token_pool.active_tokens[("graphql", None)] = token_pool.get_token_manager("gt1")
+
+    stream.check_query_budget(_costly_request(stream), None)
+
+    assert token_pool.get_active_token("graphql").token == "gt2"
+
+
+def test_query_is_not_sent_until_a_token_can_afford_it(two_tokens_tap):
+    stream = two_tokens_tap.streams["stargazers"]
+    _spend_graphql_points(stream, "gt1", 3950)
+    _spend_graphql_points(stream, "gt2", 3960)
+
+    with pytest.raises(FatalAPIError, match="estimated to cost 101 points"):
+        stream.check_query_budget(_costly_request(stream), None)
+
+
+@pytest.mark.parametrize("two_tokens_tap", [{"rate_limit_pacing": True}], indirect=True)
+def test_query_waits_for_a_token_which_can_afford_it(two_tokens_tap):
+    stream = two_tokens_tap.streams["stargazers"]
+    token_pool = stream.authenticator.token_pool
+    _spend_graphql_points(stream, "gt1", 3950)
+    _spend_graphql_points(stream, "gt2", 3960)
+
+    def reset_quotas(seconds):
+        assert seconds > 3000
+        for token_manager in token_pool.token_managers:
+            token_manager.get_rate_limit("graphql").reset = datetime.now(
+                tz=timezone.utc
+            )
+
+    with patch("tap_github.client.time.sleep", side_effect=reset_quotas) as sleep:
+        stream.check_query_budget(_costly_request(stream), None)
+    sleep.assert_called_once()
+
+
+def test_query_larger_than_any_quota_is_not_sent(two_tokens_tap):
+    stream = two_tokens_tap.streams["stargazers"]
+    # 1 + 100 + 100 * 100 + 100 * 100 * 100 requests, i.e. 10101 points.
+    query = COSTLY_QUERY.replace(
+        "{ body }", "{ reactions(first: 100) { nodes { id } } }"
+    )
+    request = requests.Request("POST", stream.url_base, json={"query": query}).prepare()
+
+    with pytest.raises(FatalAPIError, match="quota of every GitHub token"):
+        stream.check_query_budget(request, None)
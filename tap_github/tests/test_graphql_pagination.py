@@ -0,0 +1,127 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from tap_github.authenticator import GitHubTokenAuthenticator, PersonalTokenManager
+from tap_github.graphql_pagination import (
+    PaginationPaths,
+    compile_pagination_paths,
+    find_values,
+)
+
+QUERY = """
+  query repositoryDependencies($repo: String! $nextPageCursor_0: String) {
+    repository(name: $repo owner: "o") {
+      # comments and strings { are ignored
+      manifests: dependencyGraphManifests (first: 1 after: $nextPageCursor_0) {
+        pageInfo {
+          hasNextPage_0: hasNextPage
+          endCursor_0: endCursor
+        }
+        nodes {
+          ... on DependencyGraphManifest {
+            dependencies (first: 50 orderBy: {field: NAME}) @include(if: true) {
+              pageInfo {
+                hasNextPage_1: hasNextPage
+                endCursor_1: endCursor
+              }
+            }
+          }
+        }
+      }
+    }
+    rateLimit { cost }
+  }
+"""
+
+
+@pytest.fixture
+def tap():
+    from tap_github.tap import TapGitHub
+
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+    ):
+        yield TapGitHub(
+            config={"repositories": ["MeltanoLabs/tap-github"], "auth_token": "gt1"}
+        )
+
+
+def _response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(body).encode()
+    return response
+
+
+def test_compile_pagination_paths():
+    assert compile_pagination_paths(QUERY) == {
+        0: PaginationPaths(
+            ("data", "repository", "manifests", "pageInfo", "hasNextPage_0"),
+            ("data", "repository", "manifests", "pageInfo", "endCursor_0"),
+        ),
+        1: PaginationPaths(
+            (
+                "data",
+                "repository",
+                "manifests",
+                "nodes",
+                "dependencies",
+                "pageInfo",
+                "hasNextPage_1",
+            ),
+            (
+                "data",
+                "repository",
+                "manifests",
+                "nodes",
+                "dependencies",
+                "pageInfo",
+                "endCursor_1",
+            ),
+        ),
+    }
+
+
+def test_find_values_through_lists():
+    document = {"a": [{"b": {"c": 1}}, {"b": None}, {"b": {"c": 2}}]}
+    assert find_values(document, ("a", "b", "c")) == [1, 2]
+    assert find_values(document, ("a", "d")) == []
+
+
+def test_next_page_token_of_nested_pagination(tap):
+    stream = tap.streams["dependencies"]
+
+    def response(has_next_dependencies_page):
+        return _response(
+            {
+                "data": {
+                    "repository": {
+                        "dependencyGraphManifests": {
+                            "pageInfo": {"hasNextPage_0": True, "endCursor_0": "m1"},
+                            "nodes": [
+                                {
+                                    "dependencies": {
+                                        "pageInfo": {
+                                            "hasNextPage_1": has_next_dependencies_page,
+                                            "endCursor_1": "d1",
+                                        }
+                                    }
+                                }
+                            ],
+                        }
+                    }
+                }
+            }
+        )
+
+    assert stream.get_next_page_token(response(True), {"nextPageCursor_0": "m0"}) == {
+        "nextPageCursor_0": "m0",
+        "nextPageCursor_1": "d1",
+    }
+    assert stream.get_next_page_token(response(False), {"nextPageCursor_1": "d1"}) == {
+        "nextPageCursor_0": "m1",
+    }
@@ -0,0 +1,163 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from tap_github.authenticator import TokenManager, TokenPool
+from tap_github.rate_limiting import RequestPacer, SecondaryRateLimitGovernor
+
+
+def _now():
+    return datetime.now(tz=timezone.utc)
+
+
+def _token_manager(used: int, reset: datetime) -> TokenManager:
+    token_manager = TokenManager("mytoken", rate_limit_buffer=1000)
+    token_manager.update_rate_limit(
+        {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": str(5000 - used),
+            "X-RateLimit-Reset": str(int(reset.timestamp())),
+            "X-RateLimit-Used": str(used),
+        }
+    )
+    return token_manager
+
+
+class TestRequestPacer:
+    def test_no_pacing_before_quota_is_known(self):
+        pacer = RequestPacer(TokenPool([TokenManager("mytoken")]), "core")
+        with patch("tap_github.rate_limiting.time.sleep") as mock_sleep:
+            for _ in range(100):
+                assert pacer.wait() == 0
+            mock_sleep.assert_not_called()
+
+    def test_calls_are_spread_until_reset(self):
+        # 100 calls left above the buffer, 200 seconds before the reset
+        token_manager = _token_manager(3900, _now() + timedelta(seconds=200))
+        pacer = RequestPacer(TokenPool([token_manager]), "core")
+        assert pacer.get_sustainable_rate() == pytest.approx(0.5, rel=0.02)
+
+        with (
+            patch("tap_github.rate_limiting.time.monotonic", return_value=1000.0),
+            patch("tap_github.rate_limiting.time.sleep") as mock_sleep,
+        ):
+            delays = [pacer.wait() for _ in range(RequestPacer.BURST + 2)]
+
+        # the burst goes through, then calls are spaced 2 seconds apart
+        assert delays[: RequestPacer.BURST] == pytest.approx(
+            [0] * RequestPacer.BURST, abs=0.01
+        )
+        assert delays[RequestPacer.BURST :] == [
+            pytest.approx(2, rel=0.02),
+            pytest.approx(4, rel=0.02),
+        ]
+        mock_sleep.assert_called_with(delays[-1])
+
+    def test_waits_for_first_reset_when_all_tokens_are_exhausted(self):
+        token_pool = TokenPool(
+            [
+                _token_manager(4500, _now() + timedelta(seconds=300)),
+                _token_manager(4500, _now() + timedelta(seconds=60)),
+            ]
+        )
+        pacer = RequestPacer(token_pool, "core")
+        assert pacer.get_sustainable_rate() == 0
+
+        with patch("tap_github.rate_limiting.time.sleep") as mock_sleep:
+            delay = pacer.wait()
+
+        assert 55 < delay <= 60 + RequestPacer.RESET_MARGIN
+        mock_sleep.assert_called_once_with(delay)
+
+
+class TestSecondaryRateLimitGovernor:
+    def test_cooldown_follows_retry_after(self):
+        governor = SecondaryRateLimitGovernor(TokenPool([TokenManager("mytoken")]))
+        cooldown_until = governor.get_cooldown_until({"Retry-After": "30"})
+        assert (cooldown_until - _now()).total_seconds() == pytest.approx(30, abs=1)
+
+    def test_cooldown_follows_rate_limit_reset(self):
+        governor = SecondaryRateLimitGovernor(TokenPool([TokenManager("mytoken")]))
+        reset = _now() + timedelta(seconds=120)
+        cooldown_until = governor.get_cooldown_until(
+            {
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(int(reset.timestamp())),
+            }
+        )
+        assert cooldown_until == reset.replace(microsecond=0)
+
+    def test_cooldown_defaults_to_a_minute(self):
+        governor = SecondaryRateLimitGovernor(TokenPool([TokenManager("mytoken")]))
+        cooldown_until = governor.get_cooldown_until({})
+        assert (cooldown_until - _now()).total_seconds() == pytest.approx(
+            SecondaryRateLimitGovernor.DEFAULT_COOLDOWN, abs=1
+        )
+
+    def test_only_the_offending_token_cools_down(self):
+        token_managers = [TokenManager("mytoken"), TokenManager("othertoken")]
+        token_pool = TokenPool(token_managers)
+        offending_token = token_pool.get_active_token()
+        assert offending_token is not None
+
+        token_pool.governor.record_secondary_rate_limit(
+            offending_token, {"Retry-After": "60"}
+        )
+        assert token_pool.get_next_auth_token() is None
+        assert token_pool.get_active_token() is not offending_token
+        assert not offending_token.has_calls_remaining()
+
+        other_token = token_pool.get_active_token()
+        assert other_token is not None
+        token_pool.governor.record_secondary_rate_limit(
+            other_token, {"Retry-After": "30"}
+        )
+        # both tokens cool down, the one available first becomes active
+        next_available_at = token_pool.get_next_auth_token()
+        assert next_available_at == other_token.cooldown_until
+        assert token_pool.get_active_token() is other_token
+
+        with patch("tap_github.rate_limiting.time.sleep") as mock_sleep:
+            delay = token_pool.governor.wait_for_cooldown("core")
+        assert delay == pytest.approx(30, abs=1)
+        mock_sleep.assert_called_once_with(delay)
+
+    def test_concurrency_is_halved_then_grows_back(self):
+        token_pool = TokenPool([TokenManager("mytoken")], max_concurrent_requests=8)
+        governor = token_pool.governor
+        assert governor.concurrency_limit == 8
+
+        with patch("tap_github.rate_limiting.time.monotonic", return_value=1000.0):
+            governor.record_secondary_rate_limit(None, {})
+            # requests already in flight do not halve the limit again
+            governor.record_secondary_rate_limit(None, {})
+        assert governor.concurrency_limit == 4
+
+        for _ in range(4):
+            governor.record_success()
+        # about one more request in flight per window of successful requests
+        assert governor.concurrency_limit == pytest.approx(5, abs=0.1)
+
+        for _ in range(100):
+            governor.record_success()
+        assert governor.concurrency_limit == 8
+
+    def test_request_slots_are_bounded(self):
+        token_pool = TokenPool([TokenManager("mytoken")], max_concurrent_requests=1)
+        governor = token_pool.governor
+        entered = threading.Event()
+
+        def request():
+            with governor.request_slot():
+                entered.set()
+
+        with governor.request_slot():
+            thread = threading.Thread(target=request)
+            thread.start()
+            # the second request waits for the first one to release its slot
+            assert not entered.wait(timeout=0.1)
+        thread.join(timeout=1)
+        assert entered.is_set()
+        assert governor.in_flight == 0
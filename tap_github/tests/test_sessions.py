@@ -0,0 +1,135 @@
+import ssl
+from unittest.mock import patch
+
+import pytest
+import requests
+import requests_cache
+
+from tap_github.authenticator import GitHubTokenAuthenticator, PersonalTokenManager
+from tap_github.sessions import HTTPXAdapter, SessionPool, default_session_pool
+
+
+class TestSessionPool:
+    def test_one_session_per_host(self):
+        session_pool = SessionPool()
+        api_session = session_pool.get_session("https://api.github.com/repos/a/b")
+
+        assert session_pool.get_session("https://api.github.com/graphql") is (
+            api_session
+        )
+        assert session_pool.get_session("https://github.com/a/b") is not api_session
+        assert (
+            session_pool.get_session("https://ghe.example.com/api/v3")
+            is not api_session
+        )
+
+    def test_configure(self):
+        session_pool = SessionPool()
+        session = session_pool.get_session("https://api.github.com")
+        session_pool.configure(pool_maxsize=42, keep_alive=False)
+
+        new_session = session_pool.get_session("https://api.github.com")
+        assert new_session is not session
+        assert new_session.get_adapter("https://api.github.com")._pool_maxsize == 42
+        assert new_session.headers["Connection"] == "close"
+
+    def test_invalid_engine(self):
+        with pytest.raises(ValueError, match="Invalid `http_engine`"):
+            SessionPool().configure(engine="urllib3")
+
+
+def test_streams_of_a_tap_share_sessions():
+    from tap_github.tap import TapGitHub
+
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+    ):
+        tap = TapGitHub(
+            config={
+                "repositories": ["MeltanoLabs/tap-github"],
+                "auth_token": "gt1",
+                "http_pool_maxsize": 20,
+            }
+        )
+        issues = tap.streams["issues"]
+        stargazers = tap.streams["stargazers"]
+
+        assert issues.requests_session is stargazers.requests_session
+        assert issues.requests_session is default_session_pool.get_session(
+            "https://api.github.com"
+        )
+        assert default_session_pool.pool_maxsize == 20
+
+        prepared_request = issues.prepare_request(
+            context={"org": "MeltanoLabs", "repo": "tap-github"},
+            next_page_token=None,
+        )
+        assert prepared_request.headers["Authorization"] == "token gt1"
+        # the stream's authenticator is not set on the shared session
+        assert issues.requests_session.auth is None
+
+
+@pytest.fixture
+def uncached():
+    # The responses of the httpx adapter have no raw response to cache.
+    with requests_cache.disabled():
+        yield
+
+
+def test_httpx_adapter(uncached):
+    httpx = pytest.importorskip("httpx")
+    sent_requests = []
+
+    def handler(request):
+        sent_requests.append(request)
+        if request.url.path == "/timeout":
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(
+            200,
+            json=[{"id": 1}],
+            headers={"Link": '<https://api.github.com/items?page=2>; rel="next"'},
+        )
+
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPXAdapter(pool_maxsize=10, transport=httpx.MockTransport(handler)),
+    )
+    response = session.get(
+        "https://api.github.com/items", headers={"Authorization": "token gt1"}
+    )
+
+    assert response.json() == [{"id": 1}]
+    assert response.links["next"]["url"] == "https://api.github.com/items?page=2"
+    assert sent_requests[0].headers["Authorization"] == "token gt1"
+    assert "Connection" not in sent_requests[0].headers
+    with pytest.raises(requests.exceptions.Timeout):
+        session.get("https://api.github.com/timeout")
+
+
+def test_httpx_adapter_uses_the_settings_of_requests(uncached, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example.com:3128")
+    adapter = HTTPXAdapter(pool_maxsize=10)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[]))
+    )
+
+    with patch.object(adapter, "get_client", return_value=client) as get_client:
+        session.get("https://api.github.com/items", verify=False)
+
+    # the proxy is taken from the environment, as requests does
+    get_client.assert_called_once_with(False, None, "http://proxy.example.com:3128")
+
+
+def test_ssl_context_of_httpx_adapter():
+    context = HTTPXAdapter.get_ssl_context(verify=False, cert=None)
+    assert context.verify_mode == ssl.CERT_NONE
+    assert not context.check_hostname
+
+    context = HTTPXAdapter.get_ssl_context(verify=True, cert=None)
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.get_ca_certs()
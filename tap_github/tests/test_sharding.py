@@ -0,0 +1,168 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from tap_github.authenticator import GitHubTokenAuthenticator, PersonalTokenManager
+from tap_github.repository_streams import RepositoryStream
+from tap_github.sharding import (
+    ShardSupervisor,
+    merge_states,
+    select_shard,
+    select_shard_tokens,
+)
+
+REPOSITORIES = [f"MeltanoLabs/repo{i}" for i in range(50)]
+
+
+def _partition(repo, value):
+    return {
+        "context": {"org": "MeltanoLabs", "repo": repo},
+        "replication_key": "updated_at",
+        "replication_key_value": value,
+    }
+
+
+def test_shards_split_partitions():
+    shards = [
+        select_shard(
+            REPOSITORIES, {"shard_count": 3, "shard_index": index}, key=lambda r: r
+        )
+        for index in range(3)
+    ]
+    assert sorted(r for shard in shards for r in shard) == sorted(REPOSITORIES)
+    assert all(shards)
+    # keys are not case sensitive
+    assert select_shard(
+        [r.upper() for r in REPOSITORIES],
+        {"shard_count": 3, "shard_index": 0},
+        key=lambda r: r,
+    ) == [r.upper() for r in shards[0]]
+
+
+@pytest.mark.parametrize(
+    "tokens,expected",
+    [
+        (["gt1", "gt2", "gt3", "gt4"], [{"gt1", "gt3"}, {"gt2", "gt4"}]),
+        (["gt1"], [{"gt1"}, {"gt1"}]),
+    ],
+)
+def test_shards_split_tokens(tokens, expected):
+    assert [
+        select_shard_tokens(tokens, {"shard_count": 2, "shard_index": index})
+        for index in range(2)
+    ] == expected
+
+
+def test_repository_partitions_are_sharded():
+    from tap_github.tap import TapGitHub
+
+    config = {"repositories": REPOSITORIES, "auth_token": "gt1", "shard_count": 4}
+    partitions = []
+    with (
+        patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+        patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+        patch.object(
+            RepositoryStream,
+            "get_repo_ids",
+            side_effect=lambda repo_list: [
+                {"org": org, "repo": repo} for org, repo in repo_list
+            ],
+        ),
+    ):
+        for shard_index in range(4):
+            tap = TapGitHub(config={**config, "shard_index": shard_index})
+            partitions += tap.streams["repositories"].partitions
+
+    assert sorted(f"{p['org']}/{p['repo']}" for p in partitions) == sorted(REPOSITORIES)
+
+
+def test_invalid_shard_index():
+    from tap_github.tap import TapGitHub
+
+    with pytest.raises(ValueError, match="Invalid shard"):
+        TapGitHub(
+            config={"repositories": REPOSITORIES, "shard_count": 2, "shard_index": 2}
+        )
+
+
+def test_merge_states():
+    base_state = {
+        "bookmarks": {
+            "issues": {
+                "partitions": [
+                    _partition("a", "2024-01-01"),
+                    _partition("b", "2024-01-01"),
+                ]
+            },
+            "repositories": {"progress_markers": {"replication_key_value": "x"}},
+        }
+    }
+    shard_states = [
+        {
+            "bookmarks": {
+                "issues": {
+                    "partitions": [
+                        _partition("a", "2024-02-01"),
+                        _partition("b", "2024-01-01"),
+                    ]
+                },
+                "repositories": {},
+            }
+        },
+        {
+            "bookmarks": {
+                "issues": {
+                    "partitions": [
+                        _partition("a", "2024-01-01"),
+                        _partition("b", "2024-03-01"),
+                        _partition("c", "2024-03-01"),
+                    ]
+                },
+                "repositories": {},
+            }
+        },
+    ]
+
+    assert merge_states(base_state, shard_states) == {
+        "bookmarks": {
+            "issues": {
+                "partitions": [
+                    _partition("a", "2024-02-01"),
+                    _partition("b", "2024-03-01"),
+                    _partition("c", "2024-03-01"),
+                ]
+            },
+            "repositories": {},
+        }
+    }
+
+
+def test_supervisor_merges_state_messages():
+    output = io.StringIO()
+    supervisor = ShardSupervisor(workers=2, config={}, output=output)
+    record = {"type": "RECORD", "stream": "issues", "record": {"id": 1}}
+    for shard_index, repo in enumerate(["a", "b"]):
+        state = {"bookmarks": {"issues": {"partitions": [_partition(repo, "v")]}}}
+        supervisor.forward_messages(
+            shard_index,
+            io.StringIO(
+                json.dumps(record)
+                + "\n"
+                + json.dumps({"type": "STATE", "value": state})
+            ),
+        )
+
+    messages = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [message["type"] for message in messages] == [
+        "RECORD",
+        "STATE",
+        "RECORD",
+        "STATE",
+    ]
+    assert messages[-1]["value"] == {
+        "bookmarks": {
+            "issues": {"partitions": [_partition("a", "v"), _partition("b", "v")]}
+        }
+    }
@@ -0,0 +1,95 @@
+import pytest
+import requests
+from singer_sdk.exceptions import RetriableAPIError
+
+from tap_github.sizing import (
+    AdaptiveSize,
+    QueryTimeoutError,
+    QueryTooLargeError,
+    is_sizing_error,
+    request_in_chunks,
+)
+
+
+def test_size_shrinks_on_slow_or_costly_responses_and_grows_back():
+    size = AdaptiveSize(100)
+    assert size.record_response(seconds=9.0) == 50
+    assert size.record_response(seconds=0.5, cost=100) == 25
+    assert size.record_response(seconds=5.0) == 25
+    assert size.record_response(seconds=0.5, cost=1) == 31
+    assert size.scale(50) == 15
+    for _ in range(20):
+        size.record_response(seconds=0.5)
+    assert size.value == 100
+
+
+def test_size_stays_within_bounds():
+    size = AdaptiveSize(3)
+    assert [size.shrink() for _ in range(3)] == [1, 1, 1]
+    assert size.scale(100) == 33
+    assert AdaptiveSize(0).value == 1
+
+
+def test_failed_chunks_are_split_in_two():
+    chunks = []
+
+    def request(chunk):
+        chunks.append(chunk)
+        if 5 in chunk and len(chunk) > 2:
+            raise requests.exceptions.ReadTimeout
+        return [item * 10 for item in chunk]
+
+    assert request_in_chunks(list(range(8)), request, 8) == [
+        item * 10 for item in range(8)
+    ]
+    assert chunks == [
+        [0, 1, 2, 3, 4, 5, 6, 7],
+        [0, 1, 2, 3],
+        [4, 5, 6, 7],
+        [4, 5],
+        [6, 7],
+    ]
+
+
+def test_item_failing_alone_raises():
+    def request(chunk):
+        if 1 in chunk:
+            raise requests.exceptions.ReadTimeout
+        return chunk
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        request_in_chunks([0, 1, 2], request, 3)
+
+
+def _response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    [
+        (requests.exceptions.ReadTimeout(), True),
+        (RetriableAPIError("bad gateway", _response(502)), True),
+        (QueryTimeoutError("timeout", _response(200)), True),
+        (QueryTooLargeError("MAX_NODE_LIMIT_EXCEEDED"), True),
+        (RetriableAPIError("secondary rate limit", _response(403)), False),
+        (RetriableAPIError("server error", _response(500)), False),
+        (requests.exceptions.ConnectionError(), False),
+    ],
+)
+def test_is_sizing_error(error, expected):
+    assert is_sizing_error(error) is expected
+
+
+def test_chunks_are_not_split_on_other_errors():
+    chunks = []
+
+    def request(chunk):
+        chunks.append(chunk)
+        raise RetriableAPIError("secondary rate limit", _response(403))
+
+    with pytest.raises(RetriableAPIError):
+        request_in_chunks([0, 1, 2], request, 3)
+    assert chunks == [[0, 1, 2]]
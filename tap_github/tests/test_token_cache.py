@@ -0,0 +1,266 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from singer_sdk.streams import RESTStream
+
+from tap_github.authenticator import (
+    AppTokenManager,
+    GitHubTokenAuthenticator,
+    PersonalTokenManager,
+    TokenManager,
+    TokenPool,
+)
+from tap_github.token_cache import TokenStateCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "tokens.json"
+
+
+@pytest.fixture
+def mock_stream(cache_path):
+    stream = MagicMock(spec=RESTStream)
+    stream.logger = MagicMock()
+    stream.tap_name = "tap_github"
+    stream.config = {
+        "additional_auth_tokens": ["gt1", "gt2"],
+        "token_cache_path": str(cache_path),
+    }
+    return stream
+
+
+def _reset_in(seconds: int) -> int:
+    return int((datetime.now(tz=timezone.utc) + timedelta(seconds=seconds)).timestamp())
+
+
+class TestTokenStateCache:
+    def test_update_merges_entries_without_storing_tokens(self, cache_path):
+        cache = TokenStateCache(cache_path)
+        cache.update({"gt1": {"valid": True}})
+        cache.update({"gt1": {"validated_at": 1.0}, "gt2": {"valid": False}})
+
+        assert "gt1" not in cache_path.read_text()
+        assert cache.get_entries(["gt1", "gt2", "gt3"]) == {
+            "gt1": {"valid": True, "validated_at": 1.0},
+            "gt2": {"valid": False},
+            "gt3": {},
+        }
+
+    def test_unreadable_cache_is_ignored(self, cache_path):
+        cache_path.write_text("{not json")
+        assert TokenStateCache(cache_path).load() == {}
+
+    @pytest.mark.parametrize(
+        "age,expected",
+        [(10, True), (TokenStateCache.DEFAULT_VALIDATION_TTL + 10, None)],
+    )
+    def test_validation_expires(self, cache_path, age, expected):
+        cache = TokenStateCache(cache_path)
+        entry = {"valid": True, "validated_at": time.time() - age}
+        assert cache.get_validation(entry) is expected
+
+
+class TestCachedTokenValidation:
+    def test_recently_validated_tokens_are_not_validated_again(self, mock_stream):
+        def is_valid_token(self, token=None):
+            self.update_rate_limit(
+                {
+                    "X-RateLimit-Limit": "5000",
+                    "X-RateLimit-Remaining": "4000",
+                    "X-RateLimit-Reset": str(_reset_in(600)),
+                    "X-RateLimit-Used": "1000",
+                }
+            )
+            return self.token == "gt1"
+
+        with (
+            patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+            patch.object(
+                PersonalTokenManager,
+                "is_valid_token",
+                autospec=True,
+                side_effect=is_valid_token,
+            ) as mock_is_valid,
+        ):
+            first_run = GitHubTokenAuthenticator(stream=mock_stream)
+            assert [tm.token for tm in first_run.token_managers] == ["gt1"]
+            assert mock_is_valid.call_count == 2
+
+            second_run = GitHubTokenAuthenticator(stream=mock_stream)
+            assert [tm.token for tm in second_run.token_managers] == ["gt1"]
+            assert mock_is_valid.call_count == 2
+
+        # the quota seen by the first run is restored
+        assert second_run.token_managers[0].rate_limit_remaining == 4000
+
+    def test_tokens_are_validated_without_cache(self, mock_stream):
+        del mock_stream.config["token_cache_path"]
+        with (
+            patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+            patch.object(
+                PersonalTokenManager, "is_valid_token", return_value=True
+            ) as mock_is_valid,
+        ):
+            GitHubTokenAuthenticator(stream=mock_stream)
+            GitHubTokenAuthenticator(stream=mock_stream)
+
+        assert mock_is_valid.call_count == 4
+
+
+class TestAppTokenCache:
+    @pytest.mark.parametrize(
+        "expires_in,minted",
+        [
+            pytest.param(timedelta(minutes=50), 1, id="reused"),
+            pytest.param(timedelta(minutes=5), 2, id="due-for-refresh"),
+        ],
+    )
+    def test_runs_share_installation_tokens(self, cache_path, expires_in, minted):
+        def generate_token_mock(app_id, private_key, installation_id):
+            return (
+                f"token{generate_token.call_count}",
+                datetime.now(tz=timezone.utc) + expires_in,
+            )
+
+        with (
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                side_effect=generate_token_mock,
+            ) as generate_token,
+        ):
+            first_run = AppTokenManager(
+                "123;;key;;67890", token_cache=TokenStateCache(cache_path)
+            )
+            second_run = AppTokenManager(
+                "123;;key;;67890", token_cache=TokenStateCache(cache_path)
+            )
+            other_installation = AppTokenManager(
+                "123;;key;;13", token_cache=TokenStateCache(cache_path)
+            )
+
+        assert generate_token.call_count == minted + 1
+        assert (second_run.token == first_run.token) is (minted == 1)
+        assert other_installation.token not in (first_run.token, second_run.token)
+        assert "key" not in cache_path.read_text().replace("app_token", "")
+
+    @pytest.mark.parametrize("cache_app_tokens", [True, False])
+    def test_app_tokens_are_only_cached_on_demand(
+        self, mock_stream, cache_path, cache_app_tokens
+    ):
+        mock_stream.config = {
+            "auth_app_keys": ["123;;key;;67890"],
+            "token_cache_path": str(cache_path),
+            "cache_app_tokens": cache_app_tokens,
+        }
+        with (
+            patch.object(AppTokenManager, "is_valid_token", return_value=True),
+            patch(
+                "tap_github.authenticator.generate_app_access_token",
+                return_value=(
+                    "installationtoken",
+                    datetime.now(tz=timezone.utc) + timedelta(hours=1),
+                ),
+            ),
+        ):
+            auth = GitHubTokenAuthenticator(stream=mock_stream)
+            auth.token_pool.token_refresher.stop()
+
+        assert len(auth.token_managers) == 1
+        assert cache_path.exists() is cache_app_tokens
+
+
+class TestPersistedRateLimits:
+    def test_next_run_skips_tokens_drained_by_the_previous_one(self, cache_path):
+        token_pool = TokenPool(
+            [TokenManager("gt1"), TokenManager("gt2")],
+            token_cache=TokenStateCache(cache_path),
+        )
+        token_pool.update_rate_limit(
+            {
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": "1",
+                "X-RateLimit-Reset": str(_reset_in(600)),
+                "X-RateLimit-Used": "4999",
+            },
+            token="gt1",
+        )
+        token_pool.save_rate_limits()
+
+        next_run = TokenPool(
+            [TokenManager("gt1"), TokenManager("gt2")],
+            token_cache=TokenStateCache(cache_path),
+        )
+        for _ in range(5):
+            active_token = next_run.get_active_token()
+            assert active_token is not None
+            assert active_token.token == "gt2"
+        assert next_run.token_managers[0].rate_limit_remaining == 1
+
+    def test_outdated_snapshots_are_ignored(self, cache_path):
+        TokenStateCache(cache_path).update(
+            {
+                "gt1": {
+                    "rate_limits": {
+                        "core": {
+                            "limit": 5000,
+                            "remaining": 1,
+                            "reset": _reset_in(-60),
+                            "used": 4999,
+                        }
+                    }
+                }
+            }
+        )
+        token_manager = TokenManager("gt1")
+        TokenPool([token_manager], token_cache=TokenStateCache(cache_path))
+
+        assert token_manager.rate_limit_reset is None
+        assert token_manager.has_calls_remaining()
+
+    def test_requests_wait_for_a_token_when_every_snapshot_is_drained(
+        self, mock_stream, cache_path
+    ):
+        drained = {
+            "limit": 5000,
+            "remaining": 1,
+            "reset": _reset_in(600),
+            "used": 4999,
+        }
+        TokenStateCache(cache_path).update(
+            {
+                token: {
+                    "valid": True,
+                    "validated_at": time.time(),
+                    "rate_limits": {"core": drained},
+                }
+                for token in ("gt1", "gt2")
+            }
+        )
+        with (
+            patch.object(GitHubTokenAuthenticator, "get_env", return_value={}),
+            patch.object(PersonalTokenManager, "is_valid_token", return_value=True),
+        ):
+            auth = GitHubTokenAuthenticator(stream=mock_stream)
+        token_pool = auth.token_pool
+        assert token_pool.get_active_token() is not None
+
+        def reset_quotas(seconds):
+            assert seconds > 500
+            for token_manager in token_pool.token_managers:
+                token_manager.get_rate_limit().reset = datetime.now(tz=timezone.utc)
+
+        with patch(
+            "tap_github.rate_limiting.time.sleep", side_effect=reset_quotas
+        ) as sleep:
+            token_pool.get_pacer().wait()
+        sleep.assert_called_once()
+
+        request = auth.authenticate_request(
+            requests.Request("GET", "https://api.github.com/repos/a/b").prepare()
+        )
+        assert request.headers["Authorization"] in ("token gt1", "token gt2")
@@ -0,0 +1,144 @@
+"""On-disk caches of token state, shared between runs of the tap."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, the cache is then not locked.
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import logging
+    from collections.abc import Iterator
+
+
+class JSONFileCache:
+    """A JSON file shared between runs of the tap, and between concurrent runs.
+
+    Writes are done under an exclusive lock, and replace the file at once.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.path = Path(path).expanduser()
+        self.logger = logger
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the cache, across threads and processes.
+
+        The lock is reentrant, so that a read-modify-write can call other methods
+        taking it.
+        """
+        with self._thread_lock:
+            if fcntl is None or self._lock_depth > 0:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.with_name(f"{self.path.name}.lock").open("a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self) -> dict[str, dict[str, Any]]:
+        try:
+            with self.path.open() as cache_file:
+                entries = json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"Ignoring unreadable cache {self.path}: {e}")
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries: dict[str, dict[str, Any]]) -> None:
+        # Write to a temporary file first, so that readers never see a partial file.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name)
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(entries, tmp_file)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            Path(tmp_path).unlink(missing_ok=True)
+            if self.logger:
+                self.logger.warning(f"Could not write cache {self.path}: {e}")
+
+
+class TokenStateCache(JSONFileCache):
+    """A JSON file of what the tap learned about each token on previous runs.
+
+    Entries are keyed by a SHA-256 hash of the token, so that tokens themselves are
+    not written to disk. Writes merge into the current content of the file under an
+    exclusive lock, so that concurrent runs of the tap can share it.
+
+    When `cache_app_tokens` is enabled, entries keyed by GitHub App credentials also
+    hold the last installation token minted for them.
+    """
+
+    # Seconds for which a token validation result is trusted.
+    DEFAULT_VALIDATION_TTL = 300
+
+    def __init__(
+        self,
+        path: str | Path,
+        validation_ttl: int | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        super().__init__(path, logger=logger)
+        self.validation_ttl = (
+            validation_ttl
+            if validation_ttl is not None
+            else self.DEFAULT_VALIDATION_TTL
+        )
+
+    @staticmethod
+    def get_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def update(self, entries: dict[str, dict[str, Any]]) -> None:
+        """Merge entries, keyed by token, into the cache."""
+        with self.lock():
+            cached_entries = self.load()
+            for token, entry in entries.items():
+                key = self.get_key(token)
+                cached_entries[key] = {**cached_entries.get(key, {}), **entry}
+            self._write(cached_entries)
+
+    def get_entries(self, tokens: list[str]) -> dict[str, dict[str, Any]]:
+        """Return the cached entries of some tokens, keyed by token."""
+        cached_entries = self.load()
+        return {token: cached_entries.get(self.get_key(token), {}) for token in tokens}
+
+    def get_validation(self, entry: dict[str, Any]) -> bool | None:
+        """Return whether a token was found valid recently, or None if unknown."""
+        validated_at = entry.get("validated_at")
+        if validated_at is None or time.time() - validated_at > self.validation_ttl:
+            return None
+        return entry.get("valid")
@@ -10,6 +10,8 @@ from singer_sdk.exceptions import FatalAPIError
 
 from tap_github.client import GitHubGraphqlStream, GitHubRestStream
 from tap_github.schema_objects import user_object
+from tap_github.sharding import select_shard
+from tap_github.sizing import request_in_chunks
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -35,24 +37,28 @@ class UserStream(GitHubRestStream):
     def partitions(self) -> list[dict] | None:
         """Return a list of partitions."""
         if "user_usernames" in self.config:
-            input_user_list = self.config["user_usernames"]
+            input_user_list = select_shard(
+                self.config["user_usernames"], self.config, key=lambda user: user
+            )
 
-            augmented_user_list = []
-            # chunk requests to the graphql endpoint to avoid timeouts and other
-            # obscure errors that the api doesn't say much about. The actual limit
-            # seems closer to 1000, use half that to stay safe.
-            chunk_size = 500
             list_length = len(input_user_list)
             self.logger.info(f"Filtering user list of {list_length} users")
-            for ndx in range(0, list_length, chunk_size):
-                augmented_user_list += self.get_user_ids(
-                    input_user_list[ndx : ndx + chunk_size]
-                )
+            # chunk requests to the graphql endpoint to avoid timeouts and other
+            # obscure errors that the api doesn't say much about. The actual limit
+            # seems closer to 1000, start at half that and split chunks which fail.
+            augmented_user_list = request_in_chunks(
+                input_user_list, self.get_user_ids, 500, self.logger
+            )
             self.logger.info(f"Running the tap on {len(augmented_user_list)} users")
             return augmented_user_list
 
         elif "user_ids" in self.config:
-            return [{"id": user_id} for user_id in self.config["user_ids"]]
+            return [
+                {"id": user_id}
+                for user_id in select_shard(
+                    self.config["user_ids"], self.config, key=str
+                )
+            ]
         return None
 
     def get_child_context(self, record: dict, context: dict | None) -> dict:
@@ -93,7 +99,11 @@ class UserStream(GitHubRestStream):
                         f'user{i}: repositoryOwner(login: "{user}") '
                         "{ login avatarUrl}"
                     )
-                return "query {" + " ".join(chunks) + " rateLimit { cost } }"
+                return (
+                    "query {"
+                    + " ".join(chunks)
+                    + " rateLimit { cost remaining resetAt } }"
+                )
 
         if len(user_list) < 1:
             return []
@@ -290,6 +300,7 @@ class UserContributedToStream(GitHubGraphqlStream):
     # TODO - change partitioning key to user_id?
     state_partitioning_keys: ClassVar[list[str]] = ["username"]
     ignore_parent_replication_key = True
+    batch_partitions = True
 
     @property
     def query(self) -> str:
@@ -321,6 +332,8 @@ class UserContributedToStream(GitHubGraphqlStream):
             }
             rateLimit {
               cost
+              remaining
+              resetAt
             }
           }
         """  # noqa: E501